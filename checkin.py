@@ -5,21 +5,100 @@ AnyRouter.top 自动签到脚本
 
 import asyncio
 import hashlib
-import json
 import os
+import re
+import struct
 import sys
+import time
+from contextvars import ContextVar
 from datetime import datetime
 
 import httpx
-from dotenv import load_dotenv
-from playwright.async_api import async_playwright
+import orjson
 
-from utils.config import AccountConfig, AppConfig, load_accounts_config
-from utils.notify import notify
+from utils.config import AccountConfig, AppConfig, load_accounts_config, load_env_file
+
+load_env_file()
 
-load_dotenv()
+from utils.notify import notify
 
 BALANCE_HASH_FILE = 'balance_hash.txt'
+WAF_CACHE_FILE = 'waf_cache.json'
+
+# NewAPI 内部额度单位与美元的换算比例
+QUOTA_DIVISOR = 500000
+
+USER_AGENT = (
+	'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36'
+)
+
+# NewAPI/OneAPI 站点的公共请求头，按账号补充 Referer、Cookie 等字段
+BASE_HEADERS = {
+	'User-Agent': USER_AGENT,
+	'Accept': 'application/json, text/plain, */*',
+	'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+	'Accept-Encoding': 'gzip, deflate',
+	'Connection': 'keep-alive',
+	'Sec-Fetch-Dest': 'empty',
+	'Sec-Fetch-Mode': 'cors',
+	'Sec-Fetch-Site': 'same-origin',
+}
+
+# 签到 POST 请求额外携带的 headers
+CHECKIN_HEADERS = {'Content-Type': 'application/json', 'X-Requested-With': 'XMLHttpRequest'}
+
+JIUBANAI_HEADERS = {
+	'User-Agent': USER_AGENT,
+	'Accept': '*/*',
+	'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+	'Accept-Encoding': 'gzip, deflate',
+	'Referer': 'https://gy.jiubanai.com/app/me',
+	'Host': 'gy.jiubanai.com',
+	'Connection': 'keep-alive',
+}
+
+# 需要从 WAF 获取的 cookies
+REQUIRED_WAF = frozenset({'acw_tc', 'cdn_sec_tc', 'acw_sc__v2'})
+
+# 阿里云 WAF 挑战页中 acw_sc__v2 的计算参数（公开的混淆脚本还原结果）
+ACW_ARG1_PATTERN = re.compile(r"var\s+arg1\s*=\s*'([0-9A-Fa-f]+)'")
+ACW_SC_V2_POSITIONS = (
+	15, 35, 29, 24, 33, 16, 1, 38, 10, 9, 19, 31, 40, 27, 22, 23, 25, 13, 6, 11,
+	39, 18, 20, 8, 14, 21, 32, 26, 2, 30, 7, 4, 17, 5, 3, 28, 34, 37, 12, 36,
+)  # fmt: skip
+ACW_SC_V2_MASK = '3000176000856006061501533003690027800375'
+
+BAOZI_HEADERS = {
+	'User-Agent': USER_AGENT,
+	'Accept': '*/*',
+	'Host': 'lucky.5202030.xyz',
+	'Connection': 'keep-alive',
+}
+
+
+# 账号任务的日志缓冲区，任务结束后一次性输出，避免并发任务的日志交错
+_log_buffer: ContextVar[list[str] | None] = ContextVar('_log_buffer', default=None)
+
+
+def log(message: str):
+	"""输出日志，在账号任务中先写入该任务的缓冲区"""
+	buffer = _log_buffer.get()
+	if buffer is None:
+		print(message)
+	else:
+		buffer.append(message)
+
+
+async def run_with_log_buffer(coro):
+	"""执行账号任务并收集其日志，结束后一次性写出"""
+	buffer = []
+	token = _log_buffer.set(buffer)
+	try:
+		return await coro
+	finally:
+		_log_buffer.reset(token)
+		if buffer:
+			sys.stdout.write('\n'.join(buffer) + '\n')
 
 
 def load_balance_hash():
@@ -33,372 +112,572 @@ def load_balance_hash():
 	return None
 
 
-def save_balance_hash(balance_hash):
-	"""保存余额hash"""
+def save_balance_hash(balance_hash, last_balance_hash=None):
+	"""保存余额hash（未变化时跳过写入，先写临时文件再原子替换）"""
+	if balance_hash == last_balance_hash:
+		return
+
 	try:
-		with open(BALANCE_HASH_FILE, 'w', encoding='utf-8') as f:
+		temp_file = f'{BALANCE_HASH_FILE}.tmp'
+		with open(temp_file, 'w', encoding='utf-8') as f:
 			f.write(balance_hash)
+		os.replace(temp_file, BALANCE_HASH_FILE)
 	except Exception as e:
 		print(f'Warning: Failed to save balance hash: {e}')
 
 
-def generate_balance_hash(balances):
-	"""生成余额数据的hash"""
-	# 将包含 quota 和 used 的结构转换为简单的 quota 值用于 hash 计算
-	simple_balances = {k: v['quota'] for k, v in balances.items()} if balances else {}
-	balance_json = json.dumps(simple_balances, sort_keys=True, separators=(',', ':'))
-	return hashlib.sha256(balance_json.encode('utf-8')).hexdigest()[:16]
+def load_waf_cache() -> dict:
+	"""加载 WAF cookies 缓存"""
+	try:
+		if os.path.exists(WAF_CACHE_FILE):
+			with open(WAF_CACHE_FILE, 'rb') as f:
+				return orjson.loads(f.read())
+	except Exception:
+		pass
+	return {}
 
 
-def load_jiubanai_accounts():
-	"""从环境变量加载 jiubanai 账号配置"""
-	accounts_str = os.getenv('JIUBANAI_ACCOUNTS')
+def save_waf_cache(cache: dict):
+	"""保存 WAF cookies 缓存"""
+	try:
+		with open(WAF_CACHE_FILE, 'wb') as f:
+			f.write(orjson.dumps(cache))
+	except Exception as e:
+		print(f'Warning: Failed to save WAF cache: {e}')
+
+
+def waf_cache_key(provider: str, api_user: str) -> str:
+	"""WAF cookies 缓存键：provider 加 api_user 的摘要，不随账号顺序或名称变化，也不明文落盘 api_user"""
+	return f'{provider}:{hashlib.blake2b(str(api_user).encode(), digest_size=8).hexdigest()}'
+
+
+def get_cached_waf_cookies(cache_key: str) -> dict | None:
+	"""获取未过期的缓存 WAF cookies"""
+	entry = load_waf_cache().get(cache_key)
+	if entry and time.time() < entry.get('expires_at', 0):
+		return entry.get('cookies')
+	return None
+
+
+def cache_waf_cookies(cache_key: str, waf_cookies: dict, ttl: int = 1800):
+	"""缓存 WAF cookies，有效期为 ttl 秒"""
+	now = time.time()
+	# 顺带清理已过期的条目（包括旧版本按账号名称保存的缓存）
+	cache = {key: entry for key, entry in load_waf_cache().items() if now < entry.get('expires_at', 0)}
+	cache[cache_key] = {'cookies': waf_cookies, 'expires_at': now + ttl}
+	save_waf_cache(cache)
+
+
+def invalidate_waf_cookies(cache_key: str):
+	"""清除指定账号的 WAF cookies 缓存"""
+	cache = load_waf_cache()
+	if cache.pop(cache_key, None) is not None:
+		save_waf_cache(cache)
+
+
+def generate_balance_hash(balances):
+	"""生成余额数据的hash"""
+	# 仅用于检测余额变化，无需密码学强度；8 字节摘要保持 16 位十六进制的文件格式
+	# 按账号排序后直接将 quota 写入摘要，省去中间字典和 JSON 序列化
+	balance_hash = hashlib.blake2b(digest_size=8)
+	for key in sorted(balances or {}):
+		balance_hash.update(key.encode('utf-8'))
+		balance_hash.update(b'\x00')
+		balance_hash.update(struct.pack('<d', float(balances[key]['quota'])))
+		balance_hash.update(b'\x01')
+	return balance_hash.hexdigest()
+
+
+def _load_accounts_env(env: dict, env_name: str, required_keys: tuple[str, ...], label: str):
+	"""从环境变量加载数组格式的账号配置，并校验必需字段"""
+	accounts_str = env.get(env_name)
 	if not accounts_str:
 		return None
 
 	try:
-		accounts_data = json.loads(accounts_str)
+		accounts_data = orjson.loads(accounts_str)
 
 		# 检查是否为数组格式
 		if not isinstance(accounts_data, list):
-			print('ERROR: jiubanai account configuration must use array format [{}]')
+			print(f'ERROR: {label} account configuration must use array format [{{}}]')
 			return None
 
 		# 验证账号数据格式
 		for i, account in enumerate(accounts_data):
 			if not isinstance(account, dict):
-				print(f'ERROR: jiubanai Account {i + 1} configuration format is incorrect')
+				print(f'ERROR: {label} Account {i + 1} configuration format is incorrect')
 				return None
-			if 'cookies' not in account or 'veloera_user' not in account:
-				print(f'ERROR: jiubanai Account {i + 1} missing required fields (cookies, veloera_user)')
+			if not account.keys() >= set(required_keys):
+				print(f'ERROR: {label} Account {i + 1} missing required fields ({", ".join(required_keys)})')
 				return None
 
 		return accounts_data
 	except Exception as e:
-		print(f'ERROR: jiubanai account configuration format is incorrect: {e}')
+		print(f'ERROR: {label} account configuration format is incorrect: {e}')
 		return None
 
 
-def load_baozi_accounts():
+def load_jiubanai_accounts(env: dict):
+	"""从环境变量加载 jiubanai 账号配置"""
+	return _load_accounts_env(env, 'JIUBANAI_ACCOUNTS', ('cookies', 'veloera_user'), 'jiubanai')
+
+
+def load_baozi_accounts(env: dict):
 	"""从环境变量加载 baozi 账号配置"""
-	accounts_str = os.getenv('BAOZI_ACCOUNTS')
-	if not accounts_str:
-		return None
+	return _load_accounts_env(env, 'BAOZI_ACCOUNTS', ('cookies',), 'baozi')
 
+
+def get_concurrency(env: dict, default: int = 4) -> int:
+	"""读取 ANYROUTER_CONCURRENCY，非法或为空时使用默认值，最小为 1"""
+	value = env.get('ANYROUTER_CONCURRENCY', '').strip()
 	try:
-		accounts_data = json.loads(accounts_str)
+		return max(1, int(value)) if value else default
+	except ValueError:
+		print(f'[WARN] Invalid ANYROUTER_CONCURRENCY value "{value}", using {default}')
+		return default
 
-		# 检查是否为数组格式
-		if not isinstance(accounts_data, list):
-			print('ERROR: baozi account configuration must use array format [{}]')
-			return None
 
-		# 验证账号数据格式
-		for i, account in enumerate(accounts_data):
-			if not isinstance(account, dict):
-				print(f'ERROR: baozi Account {i + 1} configuration format is incorrect')
-				return None
-			if 'cookies' not in account:
-				print(f'ERROR: baozi Account {i + 1} missing required field (cookies)')
-				return None
+def get_waf_cache_ttl(env: dict, default: int = 1800) -> int:
+	"""读取 WAF_CACHE_TTL（秒），非法或为空时使用默认值，最小为 0"""
+	value = env.get('WAF_CACHE_TTL', '').strip()
+	try:
+		return max(0, int(value)) if value else default
+	except ValueError:
+		print(f'[WARN] Invalid WAF_CACHE_TTL value "{value}", using {default}')
+		return default
 
-		return accounts_data
-	except Exception as e:
-		print(f'ERROR: baozi account configuration format is incorrect: {e}')
-		return None
+
+def _parse_cookie_string(cookies_str: str) -> dict:
+	"""解析 "k1=v1; k2=v2" 格式的 cookies 字符串"""
+	# 标准格式下只需去掉键前的空格
+	return {
+		key.strip(): value
+		for key, sep, value in (cookie.partition('=') for cookie in cookies_str.strip().split(';'))
+		if sep
+	}
 
 
 def parse_cookies(cookies_data):
 	"""解析 cookies 数据"""
 	if isinstance(cookies_data, dict):
 		return cookies_data
-
 	if isinstance(cookies_data, str):
-		cookies_dict = {}
-		for cookie in cookies_data.split(';'):
-			if '=' in cookie:
-				key, value = cookie.strip().split('=', 1)
-				cookies_dict[key] = value
-		return cookies_dict
+		return _parse_cookie_string(cookies_data)
 	return {}
 
 
-async def get_waf_cookies_with_playwright(account_name: str, login_url: str):
-	"""使用 Playwright 获取 WAF cookies（隐私模式）"""
-	print(f'[PROCESSING] {account_name}: Starting browser to get WAF cookies...')
-
-	async with async_playwright() as p:
-		import tempfile
-
-		with tempfile.TemporaryDirectory() as temp_dir:
-			context = await p.chromium.launch_persistent_context(
-				user_data_dir=temp_dir,
-				headless=False,
-				user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
-				viewport={'width': 1920, 'height': 1080},
-				args=[
-					'--disable-blink-features=AutomationControlled',
-					'--disable-dev-shm-usage',
-					'--disable-web-security',
-					'--disable-features=VizDisplayCompositor',
-					'--no-sandbox',
-				],
-			)
+def build_cookie_header(cookies: dict) -> str:
+	"""将 cookies 拼接为 Cookie 请求头，避免写入共享客户端的 cookie jar"""
+	return '; '.join(f'{key}={value}' for key, value in cookies.items())
 
-			page = await context.new_page()
 
-			try:
-				print(f'[PROCESSING] {account_name}: Access login page to get initial cookies...')
+class SharedBrowser:
+	"""在所有账号之间共享的 Chromium 浏览器，首次需要时才启动"""
 
-				await page.goto(login_url, wait_until='networkidle')
+	def __init__(self):
+		self._playwright = None
+		self._browser = None
+		self._lock = asyncio.Lock()
 
+	async def get(self):
+		"""获取浏览器实例"""
+		async with self._lock:
+			if self._browser is None:
+				log('[PROCESSING] Starting shared browser for WAF cookies...')
+				# 仅在确实需要浏览器时才导入 Playwright，避免拖慢启动
+				from playwright.async_api import async_playwright
+
+				self._playwright = await async_playwright().start()
 				try:
-					await page.wait_for_function('document.readyState === "complete"', timeout=5000)
+					self._browser = await self._playwright.chromium.launch(
+						headless=True,
+						args=[
+							'--disable-blink-features=AutomationControlled',
+							'--disable-dev-shm-usage',
+							'--disable-web-security',
+							'--disable-gpu',
+							'--no-sandbox',
+						],
+					)
 				except Exception:
-					await page.wait_for_timeout(3000)
-
-				cookies = await page.context.cookies()
+					# 启动失败（如未安装 Chromium）时停止 Playwright，避免后续账号重试时泄漏驱动进程
+					await self._playwright.stop()
+					self._playwright = None
+					raise
+			return self._browser
+
+	async def close(self):
+		"""关闭浏览器及 Playwright"""
+		try:
+			if self._browser is not None:
+				browser, self._browser = self._browser, None
+				await browser.close()
+		finally:
+			if self._playwright is not None:
+				playwright, self._playwright = self._playwright, None
+				await playwright.stop()
 
-				waf_cookies = {}
-				for cookie in cookies:
-					cookie_name = cookie.get('name')
-					cookie_value = cookie.get('value')
-					if cookie_name in ['acw_tc', 'cdn_sec_tc', 'acw_sc__v2'] and cookie_value is not None:
-						waf_cookies[cookie_name] = cookie_value
+	async def __aenter__(self):
+		return self
 
-				print(f'[INFO] {account_name}: Got {len(waf_cookies)} WAF cookies')
+	async def __aexit__(self, *exc_info):
+		await self.close()
 
-				required_cookies = ['acw_tc', 'cdn_sec_tc', 'acw_sc__v2']
-				missing_cookies = [c for c in required_cookies if c not in waf_cookies]
 
-				if missing_cookies:
-					print(f'[FAILED] {account_name}: Missing WAF cookies: {missing_cookies}')
-					await context.close()
-					return None
+def compute_acw_sc_v2(arg1: str) -> str:
+	"""根据挑战页中的 arg1 计算 acw_sc__v2"""
+	# 按位置表重排 arg1，再与固定掩码逐字节异或
+	unboxed = ''.join(arg1[pos - 1] for pos in ACW_SC_V2_POSITIONS if pos <= len(arg1))
+	return ''.join(
+		f'{int(unboxed[i : i + 2], 16) ^ int(ACW_SC_V2_MASK[i : i + 2], 16):02x}'
+		for i in range(0, min(len(unboxed), len(ACW_SC_V2_MASK)), 2)
+	)
 
-				print(f'[SUCCESS] {account_name}: Successfully got all WAF cookies')
 
-				await context.close()
+async def get_waf_cookies_with_http(client: httpx.AsyncClient, account_name: str, login_url: str):
+	"""不启动浏览器，直接用 HTTP 请求完成 WAF 挑战获取 cookies"""
+	log(f'[PROCESSING] {account_name}: Trying to get WAF cookies over HTTP...')
 
-				return waf_cookies
+	headers = {
+		'User-Agent': USER_AGENT,
+		'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+		'Accept-Language': BASE_HEADERS['Accept-Language'],
+	}
 
-			except Exception as e:
-				print(f'[FAILED] {account_name}: Error occurred while getting WAF cookies: {e}')
-				await context.close()
+	try:
+		# 首次请求不携带共享客户端 cookie jar 中的 cookies
+		request = client.build_request('GET', login_url, headers=headers)
+		request.headers.pop('Cookie', None)
+		response = await client.send(request)
+		waf_cookies = {name: value for name, value in response.cookies.items() if name in REQUIRED_WAF}
+
+		match = ACW_ARG1_PATTERN.search(response.text)
+		if match:
+			waf_cookies['acw_sc__v2'] = compute_acw_sc_v2(match.group(1))
+			response = await client.get(login_url, headers={**headers, 'Cookie': build_cookie_header(waf_cookies)})
+			waf_cookies.update({name: value for name, value in response.cookies.items() if name in REQUIRED_WAF})
+			# 重放后仍返回挑战页或非 2xx，说明计算出的 acw_sc__v2 未被接受（如掩码或位置表已变化）
+			if not response.is_success or ACW_ARG1_PATTERN.search(response.text):
+				log(f'[INFO] {account_name}: HTTP WAF challenge not accepted (HTTP {response.status_code})')
 				return None
+	except httpx.HTTPError as e:
+		log(f'[INFO] {account_name}: HTTP WAF handshake failed: {e}')
+		return None
+
+	missing_cookies = REQUIRED_WAF - waf_cookies.keys()
+	if missing_cookies:
+		log(f'[INFO] {account_name}: HTTP WAF handshake missing cookies: {sorted(missing_cookies)}')
+		return None
+
+	log(f'[SUCCESS] {account_name}: Got all WAF cookies over HTTP')
+	return waf_cookies
+
+
+async def get_waf_cookies_with_playwright(browser, account_name: str, login_url: str):
+	"""使用 Playwright 获取 WAF cookies（每个账号使用独立的隐私上下文）"""
+	log(f'[PROCESSING] {account_name}: Opening browser context to get WAF cookies...')
+
+	context = await browser.new_context(
+		user_agent=USER_AGENT,
+		viewport={'width': 1920, 'height': 1080},
+	)
+
+	try:
+		page = await context.new_page()
+
+		log(f'[PROCESSING] {account_name}: Access login page to get initial cookies...')
+
+		await page.goto(login_url, wait_until='domcontentloaded', timeout=15000)
+
+		# acw_tc、cdn_sec_tc 随首个响应下发，acw_sc__v2 由挑战脚本写入，轮询直到全部到齐（最多约 5 秒）
+		for _ in range(50):
+			cookies = await context.cookies()
+			if REQUIRED_WAF <= {cookie['name'] for cookie in cookies}:
+				break
+			await asyncio.sleep(0.1)
+
+		waf_cookies = {c['name']: c['value'] for c in cookies if c['name'] in REQUIRED_WAF}
 
+		log(f'[INFO] {account_name}: Got {len(waf_cookies)} WAF cookies')
 
-def get_user_info(client, headers, user_info_url: str):
+		missing_cookies = REQUIRED_WAF - waf_cookies.keys()
+		if missing_cookies:
+			log(f'[FAILED] {account_name}: Missing WAF cookies: {sorted(missing_cookies)}')
+			return None
+
+		log(f'[SUCCESS] {account_name}: Successfully got all WAF cookies')
+
+		return waf_cookies
+
+	except Exception as e:
+		log(f'[FAILED] {account_name}: Error occurred while getting WAF cookies: {e}')
+		return None
+	finally:
+		await context.close()
+
+
+async def get_user_info(client: httpx.AsyncClient, headers, user_info_url: str):
 	"""获取用户信息"""
 	try:
-		response = client.get(user_info_url, headers=headers, timeout=30)
+		response = await client.get(user_info_url, headers=headers, timeout=30)
 
 		if response.status_code == 200:
-			data = response.json()
-			if data.get('success'):
-				user_data = data.get('data', {})
-				quota = round(user_data.get('quota', 0) / 500000, 2)
-				used_quota = round(user_data.get('used_quota', 0) / 500000, 2)
+			data = orjson.loads(response.content)
+			if isinstance(data, dict) and data.get('success'):
+				user_data = data.get('data') or {}
+				if not isinstance(user_data, dict):
+					# JSON 合法但结构不符合预期时按查询失败处理，不影响签到结果
+					return {'success': False, 'error': 'Failed to get user info: Unexpected response format'}
+				quota = round((user_data.get('quota') or 0) / QUOTA_DIVISOR, 2)
+				used_quota = round((user_data.get('used_quota') or 0) / QUOTA_DIVISOR, 2)
 				return {
 					'success': True,
 					'quota': quota,
 					'used_quota': used_quota,
 					'display': f':money: Current balance: ${quota}, Used: ${used_quota}',
 				}
-		return {'success': False, 'error': f'Failed to get user info: HTTP {response.status_code}'}
-	except Exception as e:
+		return {
+			'success': False,
+			'error': f'Failed to get user info: HTTP {response.status_code}',
+			'status_code': response.status_code,
+			# 4xx 通常意味着 cookies（包括 WAF cookies）已失效
+			'waf_rejected': 400 <= response.status_code < 500,
+		}
+	except orjson.JSONDecodeError:
+		# 阿里云 WAF 拦截时返回 200 和挑战页 HTML，而不是 JSON
+		return {'success': False, 'error': 'Failed to get user info: Invalid response format', 'waf_rejected': True}
+	except (httpx.HTTPError, TypeError) as e:
 		return {'success': False, 'error': f'Failed to get user info: {str(e)[:50]}...'}
 
 
-async def prepare_cookies(account_name: str, provider_config, user_cookies: dict) -> dict | None:
-	"""准备请求所需的 cookies（可能包含 WAF cookies）"""
+async def prepare_cookies(
+	client: httpx.AsyncClient,
+	browser: SharedBrowser,
+	account_name: str,
+	provider_config,
+	user_cookies: dict,
+	waf_key: str,
+	waf_cache_ttl: int = 1800,
+	use_cache: bool = True,
+) -> tuple[dict | None, bool]:
+	"""准备请求所需的 cookies（可能包含 WAF cookies），同时返回是否使用了缓存的 WAF cookies"""
 	waf_cookies = {}
 
 	if provider_config.needs_waf_cookies():
+		cached_cookies = get_cached_waf_cookies(waf_key) if use_cache else None
+		if cached_cookies:
+			log(f'[INFO] {account_name}: Using cached WAF cookies')
+			return {**cached_cookies, **user_cookies}, True
+
 		login_url = f'{provider_config.domain}{provider_config.login_path}'
-		waf_cookies = await get_waf_cookies_with_playwright(account_name, login_url)
+		# 优先尝试直接 HTTP 完成挑战，失败时再回退到浏览器
+		waf_cookies = await get_waf_cookies_with_http(client, account_name, login_url)
 		if not waf_cookies:
-			print(f'[FAILED] {account_name}: Unable to get WAF cookies')
-			return None
+			waf_cookies = await get_waf_cookies_with_playwright(await browser.get(), account_name, login_url)
+		if not waf_cookies:
+			log(f'[FAILED] {account_name}: Unable to get WAF cookies')
+			return None, False
+		cache_waf_cookies(waf_key, waf_cookies, waf_cache_ttl)
 	else:
-		print(f'[INFO] {account_name}: Bypass WAF not required, using user cookies directly')
+		log(f'[INFO] {account_name}: Bypass WAF not required, using user cookies directly')
 
-	return {**waf_cookies, **user_cookies}
+	return {**waf_cookies, **user_cookies}, False
 
 
-def execute_check_in(client, account_name: str, provider_config, headers: dict):
-	"""执行签到请求"""
-	print(f'[NETWORK] {account_name}: Executing check-in')
+async def execute_check_in(
+	client: httpx.AsyncClient, account_name: str, provider_config, headers: dict
+) -> tuple[bool, bool]:
+	"""执行签到请求，返回 (签到结果, 是否被 WAF 拒绝)"""
+	log(f'[NETWORK] {account_name}: Executing check-in')
 
-	checkin_headers = headers.copy()
-	checkin_headers.update({'Content-Type': 'application/json', 'X-Requested-With': 'XMLHttpRequest'})
+	checkin_headers = headers | CHECKIN_HEADERS
 
 	sign_in_url = f'{provider_config.domain}{provider_config.sign_in_path}'
-	response = client.post(sign_in_url, headers=checkin_headers, timeout=30)
+	response = await client.post(sign_in_url, headers=checkin_headers, timeout=30)
 
-	print(f'[RESPONSE] {account_name}: Response status code {response.status_code}')
+	log(f'[RESPONSE] {account_name}: Response status code {response.status_code}')
 
 	if response.status_code == 200:
+		waf_rejected = False
 		try:
-			result = response.json()
-			if result.get('ret') == 1 or result.get('code') == 0 or result.get('success'):
-				print(f'[SUCCESS] {account_name}: Check-in successful!')
-				return True
-			else:
-				error_msg = result.get('msg', result.get('message', 'Unknown error'))
-				print(f'[FAILED] {account_name}: Check-in failed - {error_msg}')
-				return False
-		except json.JSONDecodeError:
-			# 如果不是 JSON 响应，检查是否包含成功标识
-			if 'success' in response.text.lower():
-				print(f'[SUCCESS] {account_name}: Check-in successful!')
-				return True
-			else:
-				print(f'[FAILED] {account_name}: Check-in failed - Invalid response format')
-				return False
+			result = orjson.loads(response.content)
+			success = result.get('ret') == 1 or result.get('code') == 0 or bool(result.get('success'))
+			error_msg = result.get('msg', result.get('message', 'Unknown error'))
+		except orjson.JSONDecodeError:
+			# 如果不是 JSON 响应，检查是否包含成功标识；否则通常是 WAF 挑战页
+			success = b'success' in response.content.lower()
+			error_msg = 'Invalid response format'
+			waf_rejected = not success
+
+		if success:
+			log(f'[SUCCESS] {account_name}: Check-in successful!')
+		else:
+			log(f'[FAILED] {account_name}: Check-in failed - {error_msg}')
+		return success, waf_rejected
 	else:
-		print(f'[FAILED] {account_name}: Check-in failed - HTTP {response.status_code}')
-		return False
-
-
-async def check_in_account(account: AccountConfig, account_index: int, app_config: AppConfig):
+		log(f'[FAILED] {account_name}: Check-in failed - HTTP {response.status_code}')
+		# WAF cookies 可能已失效，由调用方清除缓存并重新获取
+		return False, response.status_code in (401, 403)
+
+
+async def check_in_account(
+	client: httpx.AsyncClient,
+	browser: SharedBrowser,
+	account: AccountConfig,
+	account_index: int,
+	app_config: AppConfig,
+	waf_cache_ttl: int = 1800,
+):
 	"""为单个账号执行签到操作"""
 	account_name = account.get_display_name(account_index)
-	print(f'\n[PROCESSING] Starting to process {account_name}')
+	log(f'\n[PROCESSING] Starting to process {account_name}')
 
 	provider_config = app_config.get_provider(account.provider)
 	if not provider_config:
-		print(f'[FAILED] {account_name}: Provider "{account.provider}" not found in configuration')
+		log(f'[FAILED] {account_name}: Provider "{account.provider}" not found in configuration')
 		return False, None
 
-	print(f'[INFO] {account_name}: Using provider "{account.provider}" ({provider_config.domain})')
+	log(f'[INFO] {account_name}: Using provider "{account.provider}" ({provider_config.domain})')
 
-	user_cookies = parse_cookies(account.cookies)
+	# 账号配置中的 cookies 通常已是 dict，直接使用
+	cookies_data = account.cookies
+	user_cookies = cookies_data if isinstance(cookies_data, dict) else parse_cookies(cookies_data)
 	if not user_cookies:
-		print(f'[FAILED] {account_name}: Invalid configuration format')
+		log(f'[FAILED] {account_name}: Invalid configuration format')
 		return False, None
 
-	all_cookies = await prepare_cookies(account_name, provider_config, user_cookies)
+	waf_key = waf_cache_key(account.provider, account.api_user)
+	all_cookies, from_cache = await prepare_cookies(
+		client, browser, account_name, provider_config, user_cookies, waf_key, waf_cache_ttl
+	)
 	if not all_cookies:
 		return False, None
 
-	client = httpx.Client(http2=True, timeout=30.0)
-
 	try:
-		client.cookies.update(all_cookies)
-
-		headers = {
-			'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
-			'Accept': 'application/json, text/plain, */*',
-			'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-			'Accept-Encoding': 'gzip, deflate, br, zstd',
-			'Referer': provider_config.domain,
-			'Origin': provider_config.domain,
-			'Connection': 'keep-alive',
-			'Sec-Fetch-Dest': 'empty',
-			'Sec-Fetch-Mode': 'cors',
-			'Sec-Fetch-Site': 'same-origin',
-			provider_config.api_user_key: account.api_user,
-		}
-
-		user_info_url = f'{provider_config.domain}{provider_config.user_info_path}'
-		user_info = get_user_info(client, headers, user_info_url)
-		if user_info and user_info.get('success'):
-			print(user_info['display'])
-		elif user_info:
-			print(user_info.get('error', 'Unknown error'))
-
-		if provider_config.needs_manual_check_in():
-			success = execute_check_in(client, account_name, provider_config, headers)
-			return success, user_info
-		else:
-			print(f'[INFO] {account_name}: Check-in completed automatically (triggered by user info request)')
-			return True, user_info
+		success, user_info, waf_rejected = await _check_in_with_cookies(
+			client, account_name, account, provider_config, all_cookies, stop_on_waf_rejection=from_cache
+		)
+		if waf_rejected and from_cache:
+			# 缓存的 WAF cookies 已被拒绝：清除缓存，本次运行内重新获取并重试一次
+			log(f'[INFO] {account_name}: Cached WAF cookies rejected, fetching fresh ones')
+			invalidate_waf_cookies(waf_key)
+			all_cookies, _ = await prepare_cookies(
+				client, browser, account_name, provider_config, user_cookies, waf_key, waf_cache_ttl, use_cache=False
+			)
+			if not all_cookies:
+				return False, None
+			success, user_info, waf_rejected = await _check_in_with_cookies(
+				client, account_name, account, provider_config, all_cookies
+			)
+		if waf_rejected:
+			# 新获取的 WAF cookies 同样被拒绝，清除缓存，下次运行重新获取
+			invalidate_waf_cookies(waf_key)
+		return success, user_info
 
 	except Exception as e:
-		print(f'[FAILED] {account_name}: Error occurred during check-in process - {str(e)[:50]}...')
+		log(f'[FAILED] {account_name}: Error occurred during check-in process - {str(e)[:50]}...')
 		return False, None
-	finally:
-		client.close()
 
 
-def check_in_jiubanai_account(account_info, account_index):
+async def _check_in_with_cookies(
+	client: httpx.AsyncClient,
+	account_name: str,
+	account: AccountConfig,
+	provider_config,
+	all_cookies: dict,
+	stop_on_waf_rejection: bool = False,
+) -> tuple[bool, dict, bool]:
+	"""使用给定 cookies 查询余额并签到，返回 (签到结果, 用户信息, 是否被 WAF 拒绝)"""
+	headers = BASE_HEADERS | {
+		'Referer': provider_config.domain,
+		'Origin': provider_config.domain,
+		'Cookie': build_cookie_header(all_cookies),
+		provider_config.api_user_key: account.api_user,
+	}
+
+	# 先查询余额再签到：余额会写入 balance_hash.txt，并发发送会使其时而为签到前、时而为签到后的值
+	# get_user_info 将请求与解析失败都转换为错误结果，不会中断后续签到
+	user_info_url = f'{provider_config.domain}{provider_config.user_info_path}'
+	user_info = await get_user_info(client, headers, user_info_url)
+	waf_rejected = bool(user_info.get('waf_rejected'))
+	if user_info.get('success'):
+		log(user_info['display'])
+	else:
+		log(user_info.get('error', 'Unknown error'))
+		if waf_rejected and stop_on_waf_rejection:
+			# 调用方会换用新的 WAF cookies 重试，这里不再发送注定被拦截的签到请求
+			return False, user_info, True
+
+	if provider_config.needs_manual_check_in():
+		success, sign_in_rejected = await execute_check_in(client, account_name, provider_config, headers)
+		waf_rejected = waf_rejected or sign_in_rejected
+	else:
+		log(f'[INFO] {account_name}: Check-in completed automatically (triggered by user info request)')
+		success = True
+	return success, user_info, waf_rejected
+
+
+async def check_in_jiubanai_account(client: httpx.AsyncClient, account_info, account_index):
 	"""为单个 jiubanai 账号执行签到操作"""
 	account_name = f'jiubanai Account {account_index + 1}'
-	print(f'\n[PROCESSING] Starting to process {account_name}')
+	log(f'\n[PROCESSING] Starting to process {account_name}')
 
 	# 解析账号配置
 	cookies_data = account_info.get('cookies', {})
 	veloera_user = account_info.get('veloera_user', '')
 
 	if not veloera_user:
-		print(f'[FAILED] {account_name}: veloera_user identifier not found')
+		log(f'[FAILED] {account_name}: veloera_user identifier not found')
 		return False, 'veloera_user identifier not found'
 
 	# 解析用户 cookies
 	user_cookies = parse_cookies(cookies_data)
 	if not user_cookies:
-		print(f'[FAILED] {account_name}: Invalid configuration format')
+		log(f'[FAILED] {account_name}: Invalid configuration format')
 		return False, 'Invalid configuration format'
 
-	# 使用 httpx 进行 API 请求（jiubanai 无需 WAF 绕过）
-	client = httpx.Client(http2=True, timeout=30.0)
-
+	# 使用共享的 httpx 客户端进行 API 请求（jiubanai 无需 WAF 绕过）
 	try:
-		# 设置 cookies
-		client.cookies.update(user_cookies)
-
 		# 构建请求头
-		headers = {
-			'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
-			'Accept': '*/*',
-			'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-			'Accept-Encoding': 'gzip, deflate, br',
-			'Referer': 'https://gy.jiubanai.com/app/me',
-			'Host': 'gy.jiubanai.com',
-			'Connection': 'keep-alive',
-			'veloera-user': veloera_user,
-		}
+		headers = JIUBANAI_HEADERS | {'Cookie': build_cookie_header(user_cookies), 'veloera-user': veloera_user}
 
-		print(f'[NETWORK] {account_name}: Executing check-in')
+		log(f'[NETWORK] {account_name}: Executing check-in')
 
-		response = client.post('https://gy.jiubanai.com/api/user/check_in', headers=headers, timeout=30)
+		response = await client.post('https://gy.jiubanai.com/api/user/check_in', headers=headers, timeout=30)
 
-		print(f'[RESPONSE] {account_name}: Response status code {response.status_code}')
+		log(f'[RESPONSE] {account_name}: Response status code {response.status_code}')
 
 		if response.status_code == 200:
 			try:
-				result = response.json()
+				result = orjson.loads(response.content)
 				if result.get('success'):
 					quota = result.get('data', {}).get('quota', 0)
 					message = result.get('message', '签到成功')
-					print(f'[SUCCESS] {account_name}: {message}')
+					log(f'[SUCCESS] {account_name}: {message}')
 					user_info_text = f'{message}\n💰 Quota gained: {quota}'
 					return True, user_info_text
 				else:
 					error_msg = result.get('message', 'Unknown error')
-					print(f'[FAILED] {account_name}: Check-in failed - {error_msg}')
+					log(f'[FAILED] {account_name}: Check-in failed - {error_msg}')
 					return False, error_msg
-			except json.JSONDecodeError:
+			except orjson.JSONDecodeError:
 				error_msg = 'Invalid response format'
-				print(f'[FAILED] {account_name}: {error_msg}')
+				log(f'[FAILED] {account_name}: {error_msg}')
 				return False, error_msg
 		else:
 			error_msg = f'HTTP {response.status_code}'
-			print(f'[FAILED] {account_name}: Check-in failed - {error_msg}')
+			log(f'[FAILED] {account_name}: Check-in failed - {error_msg}')
 			return False, error_msg
 
 	except Exception as e:
-		print(f'[FAILED] {account_name}: Error occurred during check-in process - {str(e)[:50]}...')
+		log(f'[FAILED] {account_name}: Error occurred during check-in process - {str(e)[:50]}...')
 		return False, f'Error: {str(e)[:50]}'
-	finally:
-		client.close()
 
 
-def check_in_baozi_account(account_info, account_index):
+async def check_in_baozi_account(client: httpx.AsyncClient, account_info, account_index):
 	"""为单个 baozi 账号执行签到操作"""
 	account_name = account_info.get('name', f'baozi Account {account_index + 1}')
-	print(f'\n[PROCESSING] Starting to process {account_name}')
+	log(f'\n[PROCESSING] Starting to process {account_name}')
 
 	# 解析账号配置
 	cookies_data = account_info.get('cookies', {})
@@ -406,104 +685,57 @@ def check_in_baozi_account(account_info, account_index):
 	# 解析用户 cookies
 	user_cookies = parse_cookies(cookies_data)
 	if not user_cookies:
-		print(f'[FAILED] {account_name}: Invalid configuration format')
+		log(f'[FAILED] {account_name}: Invalid configuration format')
 		return False, 'Invalid configuration format'
 
-	# 使用 httpx 进行 API 请求（baozi 无需 WAF 绕过）
-	client = httpx.Client(http2=True, timeout=30.0)
-
+	# 使用共享的 httpx 客户端进行 API 请求（baozi 无需 WAF 绕过）
 	try:
-		# 设置 cookies
-		client.cookies.update(user_cookies)
-
 		# 构建请求头
-		headers = {
-			'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
-			'Accept': '*/*',
-			'Host': 'lucky.5202030.xyz',
-			'Connection': 'keep-alive',
-		}
+		headers = BAOZI_HEADERS | {'Cookie': build_cookie_header(user_cookies)}
 
-		print(f'[NETWORK] {account_name}: Executing check-in')
+		log(f'[NETWORK] {account_name}: Executing check-in')
 
-		response = client.post('https://lucky.5202030.xyz/sign', headers=headers, timeout=30)
+		response = await client.post('https://lucky.5202030.xyz/sign', headers=headers, timeout=30)
 
-		print(f'[RESPONSE] {account_name}: Response status code {response.status_code}')
+		log(f'[RESPONSE] {account_name}: Response status code {response.status_code}')
 
 		if response.status_code == 200:
 			try:
-				result = response.json()
+				result = orjson.loads(response.content)
 				success = result.get('success', False)
 				message = result.get('message', '未知响应')
 
 				if success:
-					print(f'[SUCCESS] {account_name}: {message}')
+					log(f'[SUCCESS] {account_name}: {message}')
 					quota = result.get('quota', 0)
 					current_balance = result.get('current_balance', 0)
 					redemption_code = result.get('redemption_code', '')
 					user_info_text = f'{message}\n💰 Quota: {quota}\n💵 Current balance: {current_balance}\n🎟️ Redemption code: {redemption_code}'
 					return True, user_info_text
-				# 如果不是 JSON 响应，检查是否包含成功标识
-				if 'success' in response.text.lower():
-					print(f'[INFO] {account_name}: Response success, checking balance changes...')
-
-					# 获取签到后的余额信息
-					user_info_after = get_user_info(client, headers)
-					if user_info_after:
-						print(f'[INFO] {account_name}: Balance after: {user_info_after["display_text"]}')
-
-						# 比较余额是否有变化
-						if user_info_before and user_info_after:
-							balance_changed = user_info_after['quota'] != user_info_before['quota']
-							if balance_changed:
-								balance_diff = user_info_after['quota'] - user_info_before['quota']
-								print(f'[SUCCESS] {account_name}: Check-in successful! Balance increased by ${balance_diff}')
-								return True, {
-									'before': user_info_before['display_text'],
-									'after': user_info_after['display_text']
-								}
-							else:
-								print(f'[SUCCESS] {account_name}: Response success but no balance change - likely already checked in today')
-								return True, {
-									'before': user_info_before['display_text'],
-									'after': user_info_after['display_text']
-								}
-						else:
-							print(f'[WARN] {account_name}: Unable to compare balance, treating as successful')
-							return True, {
-								'before': user_info_before['display_text'] if user_info_before else 'Unknown',
-								'after': user_info_after['display_text'] if user_info_after else 'Unknown'
-							}
-					else:
-						print(f'[WARN] {account_name}: Failed to get balance after check-in, treating as successful')
-						return True, {
-							'before': user_info_before['display_text'] if user_info_before else 'Unknown',
-							'after': 'Unable to get balance'
-						}
-				else:
-					print(f'[INFO] {account_name}: {message}')
-					user_info_text = message
-					return False, user_info_text
-			except json.JSONDecodeError:
+
+				log(f'[INFO] {account_name}: {message}')
+				return False, message
+			except orjson.JSONDecodeError:
 				error_msg = 'Invalid response format'
-				print(f'[FAILED] {account_name}: {error_msg}')
+				log(f'[FAILED] {account_name}: {error_msg}')
 				return False, error_msg
 		else:
 			error_msg = f'HTTP {response.status_code}'
-			print(f'[FAILED] {account_name}: Check-in failed - {error_msg}')
+			log(f'[FAILED] {account_name}: Check-in failed - {error_msg}')
 			return False, error_msg
 
 	except Exception as e:
-		print(f'[FAILED] {account_name}: Error occurred during check-in process - {str(e)[:50]}...')
+		log(f'[FAILED] {account_name}: Error occurred during check-in process - {str(e)[:50]}...')
 		return False, f'Error: {str(e)[:50]}'
-	finally:
-		client.close()
 
 
 async def main():
 	"""主函数"""
 	print('[SYSTEM] Multi-site auto check-in script started')
-	print(f'[TIME] Execution time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+	start_ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+	print(f'[TIME] Execution time: {start_ts}')
+
+	env = dict(os.environ)
 
 	app_config = AppConfig.load_from_env()
 	print(f'[INFO] Loaded {len(app_config.providers)} provider configuration(s)')
@@ -522,170 +754,104 @@ async def main():
 	success_count = 0
 	total_count = len(accounts)
 	notification_content = []
+	notified_names: set[str] = set()  # 已写入 notification_content 的账号名称
 	structured_results = []  # 新增：存储结构化的签到结果
 	current_balances = {}
 	need_notify = False  # 是否需要发送通知
 	balance_changed = False  # 余额是否有变化
 
-	# ========== 处理 AnyRouter/AgentRouter 账号 ==========
-	for i, account in enumerate(accounts):
-		account_key = f'account_{i + 1}'
-		try:
-			success, user_info = await check_in_account(account, i, app_config)
-			if success:
-				success_count += 1
-
-			should_notify_this_account = False
-
-			if not success:
-				should_notify_this_account = True
-				need_notify = True
-				account_name = account.get_display_name(i)
-				print(f'[NOTIFY] {account_name} failed, will send notification')
-
-			# 构建结构化结果数据
-			account_result_data = {
-				'account_index': i + 1,
-				'account_name': account.get_display_name(i),
-				'provider': account.provider,
-				'success': success,
-				'balance_before': None,
-				'balance_after': None,
-				'balance_before_raw': None,
-				'balance_after_raw': None,
-				'error_message': None
-			}
-
-			if user_info and user_info.get('success'):
-				current_quota = user_info['quota']
-				current_used = user_info['used_quota']
-				current_balances[account_key] = {'quota': current_quota, 'used': current_used}
-
-				# 填充余额信息
-				account_result_data['balance_before_raw'] = current_quota
-				account_result_data['balance_after_raw'] = current_quota
-				account_result_data['balance_before'] = user_info['display']
-				account_result_data['balance_after'] = user_info['display']
-			elif user_info:
-				account_result_data['error_message'] = user_info.get('error', 'Unknown error')
-			elif not success:
-				account_result_data['error_message'] = 'Check-in failed'
-
-			structured_results.append(account_result_data)
-
-			if should_notify_this_account:
-				account_name = account.get_display_name(i)
-				status = '[SUCCESS]' if success else '[FAIL]'
-				account_result = f'{status} {account_name}'
-				if user_info and user_info.get('success'):
-					account_result += f'\n{user_info["display"]}'
-				elif user_info:
-					account_result += f'\n{user_info.get("error", "Unknown error")}'
-				notification_content.append(account_result)
-
-		except Exception as e:
-			account_name = account.get_display_name(i)
-			print(f'[FAILED] {account_name} processing exception: {e}')
-			need_notify = True  # 异常也需要通知
-			notification_content.append(f'[FAIL] {account_name} exception: {str(e)[:50]}...')
-
-			# 添加异常的结构化数据
-			structured_results.append({
-				'account_index': i + 1,
-				'account_name': account_name,
-				'provider': account.provider,
-				'success': False,
-				'balance_before': None,
-				'balance_after': None,
-				'balance_before_raw': None,
-				'balance_after_raw': None,
-				'error_message': f'Exception: {str(e)[:50]}...'
-			})
-
-	# 检查余额变化
-	current_balance_hash = generate_balance_hash(current_balances) if current_balances else None
-	if current_balance_hash:
-		if last_balance_hash is None:
-			# 首次运行
-			balance_changed = True
-			need_notify = True
-			print('[NOTIFY] First run detected, will send notification with current balances')
-		elif current_balance_hash != last_balance_hash:
-			# 余额有变化
-			balance_changed = True
-			need_notify = True
-			print('[NOTIFY] Balance changes detected, will send notification')
-		else:
-			print('[INFO] No balance changes detected')
-
-	# 为有余额变化的情况添加所有成功账号到通知内容
-	if balance_changed:
-		for i, account in enumerate(accounts):
+	# 所有账号共享同一个 HTTP 客户端（复用连接池）和同一个浏览器
+	limits = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+	async with httpx.AsyncClient(timeout=30.0, limits=limits) as client, SharedBrowser() as browser:
+		# ========== 处理 AnyRouter/AgentRouter 账号 ==========
+		# 并发执行签到，信号量限制同时打开的浏览器上下文数量
+		semaphore = asyncio.Semaphore(get_concurrency(env))
+		waf_cache_ttl = get_waf_cache_ttl(env)
+
+		async def _bounded(i: int, account: AccountConfig):
+			async with semaphore:
+				return await run_with_log_buffer(
+					check_in_account(client, browser, account, i, app_config, waf_cache_ttl)
+				)
+
+		results = await asyncio.gather(
+			*[_bounded(i, account) for i, account in enumerate(accounts)], return_exceptions=True
+		)
+
+		for i, (account, result) in enumerate(zip(accounts, results)):
 			account_key = f'account_{i + 1}'
-			if account_key in current_balances:
-				account_name = account.get_display_name(i)
-				# 只添加成功获取余额的账号，且避免重复添加
-				account_result = f'[BALANCE] {account_name}'
-				account_result += f'\n:money: Current balance: ${current_balances[account_key]["quota"]}, Used: ${current_balances[account_key]["used"]}'
-				# 检查是否已经在通知内容中（避免重复）
-				if not any(account_name in item for item in notification_content):
-					notification_content.append(account_result)
-
-	# 保存当前余额hash
-	if current_balance_hash:
-		save_balance_hash(current_balance_hash)
-
-	# ========== jiubanai 签到 ==========
-	print('\n' + '='*50)
-	print('[SYSTEM] Starting jiubanai check-in process')
-	print('='*50)
-
-	jiubanai_accounts = load_jiubanai_accounts()
-	jiubanai_success = 0
-	jiubanai_total = 0
-	jiubanai_notification_content = []
-
-	if jiubanai_accounts:
-		print(f'[INFO] Found {len(jiubanai_accounts)} jiubanai account configurations')
-		jiubanai_total = len(jiubanai_accounts)
-
-		for i, account in enumerate(jiubanai_accounts):
 			try:
-				success, user_info = check_in_jiubanai_account(account, i)
+				if isinstance(result, BaseException):
+					raise result
+				success, user_info = result
 				if success:
-					jiubanai_success += 1
+					success_count += 1
 
-				# jiubanai 总是需要通知（无论成功失败）
-				need_notify = True
-				status = '[SUCCESS]' if success else '[FAIL]'
-				account_result = f'{status} jiubanai Account {i + 1}'
-				if user_info:
-					account_result += f'\n{user_info}'
-				jiubanai_notification_content.append(account_result)
+				should_notify_this_account = False
 
-				# 添加结构化数据
-				structured_results.append({
-					'account_index': total_count + i + 1,
-					'account_name': f'jiubanai Account {i + 1}',
-					'provider': 'jiubanai',
+				if not success:
+					should_notify_this_account = True
+					need_notify = True
+					account_name = account.get_display_name(i)
+					print(f'[NOTIFY] {account_name} failed, will send notification')
+
+				# 构建结构化结果数据
+				account_result_data = {
+					'account_index': i + 1,
+					'account_name': account.get_display_name(i),
+					'provider': account.provider,
 					'success': success,
-					'balance_before': user_info if success else None,
-					'balance_after': user_info if success else None,
+					'balance_before': None,
+					'balance_after': None,
 					'balance_before_raw': None,
 					'balance_after_raw': None,
-					'error_message': user_info if not success else None
-				})
+					'error_message': None
+				}
+
+				if user_info and user_info.get('success'):
+					current_quota = user_info['quota']
+					current_used = user_info['used_quota']
+					current_balances[account_key] = {
+						'quota': current_quota,
+						'used': current_used,
+						'display': user_info['display'],
+					}
+
+					# 填充余额信息
+					account_result_data['balance_before_raw'] = current_quota
+					account_result_data['balance_after_raw'] = current_quota
+					account_result_data['balance_before'] = user_info['display']
+					account_result_data['balance_after'] = user_info['display']
+				elif user_info:
+					account_result_data['error_message'] = user_info.get('error', 'Unknown error')
+				elif not success:
+					account_result_data['error_message'] = 'Check-in failed'
+
+				structured_results.append(account_result_data)
+
+				if should_notify_this_account:
+					account_name = account.get_display_name(i)
+					status = '[SUCCESS]' if success else '[FAIL]'
+					account_result = f'{status} {account_name}'
+					if user_info and user_info.get('success'):
+						account_result += f'\n{user_info["display"]}'
+					elif user_info:
+						account_result += f'\n{user_info.get("error", "Unknown error")}'
+					notification_content.append(account_result)
+					notified_names.add(account_name)
 
 			except Exception as e:
-				print(f'[FAILED] jiubanai Account {i + 1} processing exception: {e}')
-				need_notify = True
-				jiubanai_notification_content.append(f'[FAIL] jiubanai Account {i + 1} exception: {str(e)[:50]}...')
+				account_name = account.get_display_name(i)
+				print(f'[FAILED] {account_name} processing exception: {e}')
+				need_notify = True  # 异常也需要通知
+				notification_content.append(f'[FAIL] {account_name} exception: {str(e)[:50]}...')
+				notified_names.add(account_name)
 
 				# 添加异常的结构化数据
 				structured_results.append({
-					'account_index': total_count + i + 1,
-					'account_name': f'jiubanai Account {i + 1}',
-					'provider': 'jiubanai',
+					'account_index': i + 1,
+					'account_name': account_name,
+					'provider': account.provider,
 					'success': False,
 					'balance_before': None,
 					'balance_after': None,
@@ -693,75 +859,187 @@ async def main():
 					'balance_after_raw': None,
 					'error_message': f'Exception: {str(e)[:50]}...'
 				})
-	else:
-		print('[INFO] No jiubanai accounts configured, skipping')
 
-	# ========== baozi 签到 ==========
-	print('\n' + '='*50)
-	print('[SYSTEM] Starting baozi check-in process')
-	print('='*50)
+		# 检查余额变化
+		current_balance_hash = generate_balance_hash(current_balances) if current_balances else None
+		if current_balance_hash:
+			if last_balance_hash is None:
+				# 首次运行
+				balance_changed = True
+				need_notify = True
+				print('[NOTIFY] First run detected, will send notification with current balances')
+			elif current_balance_hash != last_balance_hash:
+				# 余额有变化
+				balance_changed = True
+				need_notify = True
+				print('[NOTIFY] Balance changes detected, will send notification')
+			else:
+				print('[INFO] No balance changes detected')
+
+		# 为有余额变化的情况添加所有成功账号到通知内容
+		if balance_changed:
+			for i, account in enumerate(accounts):
+				account_key = f'account_{i + 1}'
+				if account_key in current_balances:
+					account_name = account.get_display_name(i)
+					# 只添加成功获取余额的账号，且避免重复添加
+					account_result = f'[BALANCE] {account_name}\n{current_balances[account_key]["display"]}'
+					# 检查是否已经在通知内容中（避免重复）
+					if account_name not in notified_names:
+						notification_content.append(account_result)
+						notified_names.add(account_name)
+
+		# 保存当前余额hash
+		if current_balance_hash:
+			save_balance_hash(current_balance_hash, last_balance_hash)
+
+		# ========== jiubanai 签到 ==========
+		print('\n' + '='*50)
+		print('[SYSTEM] Starting jiubanai check-in process')
+		print('='*50)
 
-	baozi_accounts = load_baozi_accounts()
-	baozi_success = 0
-	baozi_total = 0
-	baozi_notification_content = []
+		jiubanai_accounts = load_jiubanai_accounts(env)
+		jiubanai_success = 0
+		jiubanai_total = 0
+		jiubanai_notification_content = []
 
-	if baozi_accounts:
-		print(f'[INFO] Found {len(baozi_accounts)} baozi account configurations')
-		baozi_total = len(baozi_accounts)
+		if jiubanai_accounts:
+			print(f'[INFO] Found {len(jiubanai_accounts)} jiubanai account configurations')
+			jiubanai_total = len(jiubanai_accounts)
 
-		for i, account in enumerate(baozi_accounts):
-			try:
-				success, user_info = check_in_baozi_account(account, i)
-				if success:
-					baozi_success += 1
+			jiubanai_results = await asyncio.gather(
+				*[
+					run_with_log_buffer(check_in_jiubanai_account(client, account, i))
+					for i, account in enumerate(jiubanai_accounts)
+				],
+				return_exceptions=True,
+			)
 
-				# baozi 总是需要通知（无论成功失败）
-				need_notify = True
-				status = '[SUCCESS]' if success else '[INFO]'
-				account_name = account.get('name', f'baozi Account {i + 1}')
-				account_result = f'{status} {account_name}'
-				if user_info:
-					account_result += f'\n{user_info}'
-				baozi_notification_content.append(account_result)
-
-				# 添加结构化数据
-				structured_results.append({
-					'account_index': total_count + jiubanai_total + i + 1,
-					'account_name': account_name,
-					'provider': 'baozi',
-					'success': success,
-					'balance_before': user_info if success else None,
-					'balance_after': user_info if success else None,
-					'balance_before_raw': None,
-					'balance_after_raw': None,
-					'error_message': user_info if not success else None
-				})
+			for i, (account, result) in enumerate(zip(jiubanai_accounts, jiubanai_results)):
+				try:
+					if isinstance(result, BaseException):
+						raise result
+					success, user_info = result
+					if success:
+						jiubanai_success += 1
+
+					# jiubanai 总是需要通知（无论成功失败）
+					need_notify = True
+					status = '[SUCCESS]' if success else '[FAIL]'
+					account_result = f'{status} jiubanai Account {i + 1}'
+					if user_info:
+						account_result += f'\n{user_info}'
+					jiubanai_notification_content.append(account_result)
+
+					# 添加结构化数据
+					structured_results.append({
+						'account_index': total_count + i + 1,
+						'account_name': f'jiubanai Account {i + 1}',
+						'provider': 'jiubanai',
+						'success': success,
+						'balance_before': user_info if success else None,
+						'balance_after': user_info if success else None,
+						'balance_before_raw': None,
+						'balance_after_raw': None,
+						'error_message': user_info if not success else None
+					})
+
+				except Exception as e:
+					print(f'[FAILED] jiubanai Account {i + 1} processing exception: {e}')
+					need_notify = True
+					jiubanai_notification_content.append(f'[FAIL] jiubanai Account {i + 1} exception: {str(e)[:50]}...')
+
+					# 添加异常的结构化数据
+					structured_results.append({
+						'account_index': total_count + i + 1,
+						'account_name': f'jiubanai Account {i + 1}',
+						'provider': 'jiubanai',
+						'success': False,
+						'balance_before': None,
+						'balance_after': None,
+						'balance_before_raw': None,
+						'balance_after_raw': None,
+						'error_message': f'Exception: {str(e)[:50]}...'
+					})
+		else:
+			print('[INFO] No jiubanai accounts configured, skipping')
 
-			except Exception as e:
-				print(f'[FAILED] baozi Account {i + 1} processing exception: {e}')
-				need_notify = True
-				baozi_notification_content.append(f'[FAIL] baozi Account {i + 1} exception: {str(e)[:50]}...')
+		# ========== baozi 签到 ==========
+		print('\n' + '='*50)
+		print('[SYSTEM] Starting baozi check-in process')
+		print('='*50)
 
-				# 添加异常的结构化数据
-				account_name = account.get('name', f'baozi Account {i + 1}')
-				structured_results.append({
-					'account_index': total_count + jiubanai_total + i + 1,
-					'account_name': account_name,
-					'provider': 'baozi',
-					'success': False,
-					'balance_before': None,
-					'balance_after': None,
-					'balance_before_raw': None,
-					'balance_after_raw': None,
-					'error_message': f'Exception: {str(e)[:50]}...'
-				})
-	else:
-		print('[INFO] No baozi accounts configured, skipping')
+		baozi_accounts = load_baozi_accounts(env)
+		baozi_success = 0
+		baozi_total = 0
+		baozi_notification_content = []
+
+		if baozi_accounts:
+			print(f'[INFO] Found {len(baozi_accounts)} baozi account configurations')
+			baozi_total = len(baozi_accounts)
+
+			baozi_results = await asyncio.gather(
+				*[
+					run_with_log_buffer(check_in_baozi_account(client, account, i))
+					for i, account in enumerate(baozi_accounts)
+				],
+				return_exceptions=True,
+			)
+
+			for i, (account, result) in enumerate(zip(baozi_accounts, baozi_results)):
+				try:
+					if isinstance(result, BaseException):
+						raise result
+					success, user_info = result
+					if success:
+						baozi_success += 1
+
+					# baozi 总是需要通知（无论成功失败）
+					need_notify = True
+					status = '[SUCCESS]' if success else '[INFO]'
+					account_name = account.get('name', f'baozi Account {i + 1}')
+					account_result = f'{status} {account_name}'
+					if user_info:
+						account_result += f'\n{user_info}'
+					baozi_notification_content.append(account_result)
+
+					# 添加结构化数据
+					structured_results.append({
+						'account_index': total_count + jiubanai_total + i + 1,
+						'account_name': account_name,
+						'provider': 'baozi',
+						'success': success,
+						'balance_before': user_info if success else None,
+						'balance_after': user_info if success else None,
+						'balance_before_raw': None,
+						'balance_after_raw': None,
+						'error_message': user_info if not success else None
+					})
+
+				except Exception as e:
+					print(f'[FAILED] baozi Account {i + 1} processing exception: {e}')
+					need_notify = True
+					baozi_notification_content.append(f'[FAIL] baozi Account {i + 1} exception: {str(e)[:50]}...')
+
+					# 添加异常的结构化数据
+					account_name = account.get('name', f'baozi Account {i + 1}')
+					structured_results.append({
+						'account_index': total_count + jiubanai_total + i + 1,
+						'account_name': account_name,
+						'provider': 'baozi',
+						'success': False,
+						'balance_before': None,
+						'balance_after': None,
+						'balance_before_raw': None,
+						'balance_after_raw': None,
+						'error_message': f'Exception: {str(e)[:50]}...'
+					})
+		else:
+			print('[INFO] No baozi accounts configured, skipping')
 
 	# ========== 构建最终通知内容 ==========
 	if need_notify and (notification_content or jiubanai_notification_content or baozi_notification_content):
-		time_info = f'[TIME] Execution time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
+		time_info = f'[TIME] Execution time: {start_ts}'
 
 		final_notification = [time_info]
 
@@ -823,12 +1101,12 @@ async def main():
 			'summary': {
 				'success_count': total_all_success,
 				'total_count': total_all_accounts,
-				'execution_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+				'execution_time': start_ts
 			},
 			'accounts': structured_results
 		}
 
-		notify.push_message_structured(notification_data, msg_type='text')
+		await notify.apush_message_structured(notification_data, msg_type='text')
 		print('[NOTIFY] Notification sent due to failures or balance changes')
 	else:
 		print('[INFO] All accounts successful and no balance changes detected, notification skipped')
@@ -838,10 +1116,19 @@ async def main():
 	sys.exit(0 if total_all_success > 0 else 1)
 
 
+def run_async(coro):
+	"""运行协程，安装了可选依赖 uvloop 时使用其事件循环"""
+	try:
+		import uvloop
+	except ImportError:
+		return asyncio.run(coro)
+	return uvloop.run(coro)
+
+
 def run_main():
 	"""运行主函数的包装函数"""
 	try:
-		asyncio.run(main())
+		run_async(main())
 	except KeyboardInterrupt:
 		print('\n[WARNING] Program interrupted by user')
 		sys.exit(1)
@@ -0,0 +1,431 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import orjson
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import checkin
+from checkin import (
+	SharedBrowser,
+	cache_waf_cookies,
+	check_in_account,
+	compute_acw_sc_v2,
+	get_cached_waf_cookies,
+	get_user_info,
+	get_waf_cache_ttl,
+	get_waf_cookies_with_http,
+	invalidate_waf_cookies,
+	load_waf_cache,
+	save_waf_cache,
+	waf_cache_key,
+)
+from utils.config import AccountConfig, AppConfig, ProviderConfig
+
+LOGIN_URL = 'https://waf.example.com/login'
+USER_INFO_URL = 'https://waf.example.com/api/user/self'
+
+
+@pytest.mark.parametrize(
+	'arg1, expected',
+	[
+		# 期望值由挑战页脚本中的 unsbox()/hexXor() 原函数在 node 下计算得到
+		('6F1C04B2A9E5D83C7B0A41F29D6E5C8B3A7F1E20', '07522b0e9a8d66199b5b2af1b4be95bc579ea22a'),
+		('0A0B0C0D0E0F101112131415161718191A1B1C1D', '2115066ce094b14717d5136e3195c10b3787a28e'),
+	],
+)
+def test_compute_acw_sc_v2(arg1, expected):
+	assert compute_acw_sc_v2(arg1) == expected
+
+
+def _run_waf_handshake(handler):
+	async def _run():
+		async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+			return await get_waf_cookies_with_http(client, 'Account 1', LOGIN_URL)
+
+	return asyncio.run(_run())
+
+
+def test_get_waf_cookies_with_http_missing_arg1():
+	def handler(request):
+		return httpx.Response(
+			200,
+			headers=[('Set-Cookie', 'acw_tc=tc; Path=/'), ('Set-Cookie', 'cdn_sec_tc=sec; Path=/')],
+			text='<html><body>no challenge here</body></html>',
+		)
+
+	assert _run_waf_handshake(handler) is None
+
+
+def test_get_waf_cookies_with_http_solves_challenge():
+	arg1 = '6F1C04B2A9E5D83C7B0A41F29D6E5C8B3A7F1E20'
+	requests = []
+
+	def handler(request):
+		requests.append(request)
+		if len(requests) == 1:
+			return httpx.Response(
+				200,
+				headers=[('Set-Cookie', 'acw_tc=tc; Path=/'), ('Set-Cookie', 'cdn_sec_tc=sec; Path=/')],
+				text=f"<html><script>var arg1='{arg1}';</script></html>",
+			)
+		return httpx.Response(200, text='<html>login</html>')
+
+	waf_cookies = _run_waf_handshake(handler)
+
+	assert waf_cookies == {'acw_tc': 'tc', 'cdn_sec_tc': 'sec', 'acw_sc__v2': compute_acw_sc_v2(arg1)}
+	assert f'acw_sc__v2={compute_acw_sc_v2(arg1)}' in requests[1].headers['Cookie']
+
+
+@pytest.mark.parametrize(
+	'replay_response',
+	[
+		httpx.Response(200, text="<html><script>var arg1='6F1C04B2A9E5D83C7B0A41F29D6E5C8B3A7F1E20';</script></html>"),
+		httpx.Response(403, text='<html>forbidden</html>'),
+	],
+)
+def test_get_waf_cookies_with_http_challenge_rejected(replay_response):
+	requests = []
+
+	def handler(request):
+		requests.append(request)
+		if len(requests) == 1:
+			return httpx.Response(
+				200,
+				headers=[('Set-Cookie', 'acw_tc=tc; Path=/'), ('Set-Cookie', 'cdn_sec_tc=sec; Path=/')],
+				text="<html><script>var arg1='6F1C04B2A9E5D83C7B0A41F29D6E5C8B3A7F1E20';</script></html>",
+			)
+		return replay_response
+
+	assert _run_waf_handshake(handler) is None
+	assert len(requests) == 2
+
+
+def _run_get_user_info(body):
+	async def _run():
+		transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+		async with httpx.AsyncClient(transport=transport) as client:
+			return await get_user_info(client, {}, USER_INFO_URL)
+
+	return asyncio.run(_run())
+
+
+def test_get_user_info_success():
+	user_info = _run_get_user_info(orjson.dumps({'success': True, 'data': {'quota': 1000000, 'used_quota': 250000}}))
+
+	assert user_info['success'] is True
+	assert user_info['quota'] == 2.0
+	assert user_info['used_quota'] == 0.5
+
+
+def test_get_user_info_null_data():
+	user_info = _run_get_user_info(b'{"success": true, "data": null}')
+
+	assert user_info['success'] is True
+	assert user_info['quota'] == 0
+
+
+@pytest.mark.parametrize(
+	'body',
+	[
+		b'{"success": true, "data": [1]}',
+		b'{"success": true, "data": "oops"}',
+		b'{"success": true, "data": {"quota": "oops"}}',
+		b'[1, 2]',
+		b'{"success": false}',
+		b'<html>',
+	],
+)
+def test_get_user_info_unexpected_shape(body):
+	user_info = _run_get_user_info(body)
+
+	assert user_info['success'] is False
+	assert user_info['error'].startswith('Failed to get user info')
+
+
+def _run_check_in_account(tmp_path, monkeypatch, user_info_response, requests=None):
+	monkeypatch.setattr(checkin, 'WAF_CACHE_FILE', str(tmp_path / 'waf_cache.json'))
+	provider = ProviderConfig(name='waf', domain='https://waf.example.com', bypass_method='waf_cookies')
+	app_config = AppConfig(providers={'waf': provider})
+	account = AccountConfig(cookies={'session': 'abc'}, api_user='1', provider='waf')
+
+	def handler(request):
+		if requests is not None:
+			requests.append(request.url.path)
+		if request.url.path == '/login':
+			return httpx.Response(
+				200,
+				headers=[
+					('Set-Cookie', 'acw_tc=tc; Path=/'),
+					('Set-Cookie', 'cdn_sec_tc=sec; Path=/'),
+					('Set-Cookie', 'acw_sc__v2=v2; Path=/'),
+				],
+			)
+		if request.url.path == '/api/user/sign_in':
+			return httpx.Response(200, json={'success': True})
+		return user_info_response
+
+	async def _run():
+		async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+			return await check_in_account(client, None, account, 0, app_config)
+
+	return asyncio.run(_run())
+
+
+def test_check_in_account_survives_user_info_shape(tmp_path, monkeypatch):
+	success, user_info = _run_check_in_account(
+		tmp_path, monkeypatch, httpx.Response(200, json={'success': True, 'data': None})
+	)
+
+	assert success is True
+	assert user_info['success'] is True
+
+
+def test_check_in_account_queries_balance_before_sign_in(tmp_path, monkeypatch):
+	requests = []
+	success, user_info = _run_check_in_account(
+		tmp_path, monkeypatch, httpx.Response(200, json={'success': True, 'data': {'quota': 500000}}), requests
+	)
+
+	assert success is True
+	assert user_info['quota'] == 1.0
+	assert requests[-2:] == ['/api/user/self', '/api/user/sign_in']
+
+
+def test_check_in_account_user_info_failure_keeps_sign_in_result(tmp_path, monkeypatch):
+	success, user_info = _run_check_in_account(tmp_path, monkeypatch, httpx.Response(500))
+
+	assert success is True
+	assert user_info['success'] is False
+
+
+@pytest.fixture
+def waf_cache_file(tmp_path, monkeypatch):
+	path = tmp_path / 'waf_cache.json'
+	monkeypatch.setattr(checkin, 'WAF_CACHE_FILE', str(path))
+	return path
+
+
+def test_waf_cache_key():
+	key = waf_cache_key('anyrouter', '12345')
+
+	assert key == waf_cache_key('anyrouter', '12345')
+	assert key.startswith('anyrouter:')
+	assert '12345' not in key
+	assert key != waf_cache_key('agentrouter', '12345')
+	assert key != waf_cache_key('anyrouter', '12346')
+
+
+def test_waf_cache_ttl_expiry(waf_cache_file, monkeypatch):
+	now = 1_000_000.0
+	monkeypatch.setattr(checkin.time, 'time', lambda: now)
+	cache_waf_cookies('anyrouter:a', {'acw_tc': 'tc'}, ttl=60)
+
+	assert get_cached_waf_cookies('anyrouter:a') == {'acw_tc': 'tc'}
+
+	now += 61
+	assert get_cached_waf_cookies('anyrouter:a') is None
+
+
+def test_waf_cache_prunes_expired_entries(waf_cache_file, monkeypatch):
+	monkeypatch.setattr(checkin.time, 'time', lambda: 1_000_000.0)
+	save_waf_cache(
+		{
+			'anyrouter:expired': {'cookies': {'acw_tc': 'old'}, 'expires_at': 999_999.0},
+			'anyrouter:valid': {'cookies': {'acw_tc': 'keep'}, 'expires_at': 1_000_100.0},
+			'Account 1': {'cookies': {'acw_tc': 'legacy'}},
+		}
+	)
+
+	cache_waf_cookies('anyrouter:new', {'acw_tc': 'new'}, ttl=60)
+
+	assert set(load_waf_cache()) == {'anyrouter:valid', 'anyrouter:new'}
+
+
+def test_invalidate_waf_cookies(waf_cache_file):
+	cache_waf_cookies('anyrouter:a', {'acw_tc': 'a'})
+	cache_waf_cookies('anyrouter:b', {'acw_tc': 'b'})
+
+	invalidate_waf_cookies('anyrouter:a')
+	invalidate_waf_cookies('anyrouter:missing')
+
+	assert get_cached_waf_cookies('anyrouter:a') is None
+	assert get_cached_waf_cookies('anyrouter:b') == {'acw_tc': 'b'}
+
+
+@pytest.mark.parametrize(
+	'value, expected',
+	[(None, 1800), ('', 1800), (' 600 ', 600), ('0', 0), ('-5', 0), ('30m', 1800)],
+)
+def test_get_waf_cache_ttl(value, expected):
+	env = {} if value is None else {'WAF_CACHE_TTL': value}
+
+	assert get_waf_cache_ttl(env) == expected
+
+
+def test_check_in_account_refetches_rejected_cached_waf_cookies(waf_cache_file):
+	provider = ProviderConfig(name='waf', domain='https://waf.example.com', bypass_method='waf_cookies')
+	app_config = AppConfig(providers={'waf': provider})
+	account = AccountConfig(cookies={'session': 'abc'}, api_user='1', provider='waf')
+	waf_key = waf_cache_key('waf', '1')
+	cache_waf_cookies(waf_key, {'acw_tc': 'tc', 'cdn_sec_tc': 'sec', 'acw_sc__v2': 'stale'})
+	requests = []
+
+	def handler(request):
+		requests.append(request.url.path)
+		if request.url.path == '/login':
+			return httpx.Response(
+				200,
+				headers=[
+					('Set-Cookie', 'acw_tc=tc; Path=/'),
+					('Set-Cookie', 'cdn_sec_tc=sec; Path=/'),
+					('Set-Cookie', 'acw_sc__v2=fresh; Path=/'),
+				],
+			)
+		if 'acw_sc__v2=fresh' not in request.headers['Cookie']:
+			# 阿里云 WAF 拦截时返回 200 和挑战页
+			return httpx.Response(200, text="<html><script>var arg1='0A0B0C0D';</script></html>")
+		if request.url.path == '/api/user/sign_in':
+			return httpx.Response(200, json={'success': True})
+		return httpx.Response(200, json={'success': True, 'data': {'quota': 500000}})
+
+	async def _run():
+		async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+			return await check_in_account(client, None, account, 0, app_config)
+
+	success, user_info = asyncio.run(_run())
+
+	assert success is True
+	assert user_info['quota'] == 1.0
+	# 缓存的 cookies 被拒绝后不再发送签到请求，重新获取后依次查询余额与签到
+	assert requests == ['/api/user/self', '/login', '/api/user/self', '/api/user/sign_in']
+	assert get_cached_waf_cookies(waf_key)['acw_sc__v2'] == 'fresh'
+
+
+def test_check_in_account_refetches_when_sign_in_rejected(waf_cache_file):
+	provider = ProviderConfig(name='waf', domain='https://waf.example.com', bypass_method='waf_cookies')
+	app_config = AppConfig(providers={'waf': provider})
+	account = AccountConfig(cookies={'session': 'abc'}, api_user='1', provider='waf')
+	waf_key = waf_cache_key('waf', '1')
+	cache_waf_cookies(waf_key, {'acw_tc': 'tc', 'cdn_sec_tc': 'sec', 'acw_sc__v2': 'stale'})
+	requests = []
+
+	def handler(request):
+		requests.append(request.url.path)
+		if request.url.path == '/login':
+			return httpx.Response(
+				200,
+				headers=[
+					('Set-Cookie', 'acw_tc=tc; Path=/'),
+					('Set-Cookie', 'cdn_sec_tc=sec; Path=/'),
+					('Set-Cookie', 'acw_sc__v2=fresh; Path=/'),
+				],
+			)
+		if request.url.path == '/api/user/sign_in':
+			if 'acw_sc__v2=fresh' not in request.headers['Cookie']:
+				return httpx.Response(403)
+			return httpx.Response(200, json={'success': True})
+		return httpx.Response(200, json={'success': True, 'data': {'quota': 500000}})
+
+	async def _run():
+		async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+			return await check_in_account(client, None, account, 0, app_config)
+
+	success, user_info = asyncio.run(_run())
+
+	assert success is True
+	assert requests == ['/api/user/self', '/api/user/sign_in', '/login', '/api/user/self', '/api/user/sign_in']
+	assert get_cached_waf_cookies(waf_key)['acw_sc__v2'] == 'fresh'
+
+
+def test_check_in_account_drops_rejected_fresh_waf_cookies(waf_cache_file):
+	provider = ProviderConfig(name='waf', domain='https://waf.example.com', bypass_method='waf_cookies')
+	app_config = AppConfig(providers={'waf': provider})
+	account = AccountConfig(cookies={'session': 'abc'}, api_user='1', provider='waf')
+
+	def handler(request):
+		if request.url.path == '/login':
+			return httpx.Response(
+				200,
+				headers=[
+					('Set-Cookie', 'acw_tc=tc; Path=/'),
+					('Set-Cookie', 'cdn_sec_tc=sec; Path=/'),
+					('Set-Cookie', 'acw_sc__v2=v2; Path=/'),
+				],
+			)
+		return httpx.Response(200, text="<html><script>var arg1='0A0B0C0D';</script></html>")
+
+	async def _run():
+		async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+			return await check_in_account(client, None, account, 0, app_config)
+
+	success, user_info = asyncio.run(_run())
+
+	assert success is False
+	assert get_cached_waf_cookies(waf_cache_key('waf', '1')) is None
+
+
+class _FakePlaywright:
+	def __init__(self, launch_error=None):
+		self.stopped = False
+		self.chromium = self
+		self._launch_error = launch_error
+
+	async def launch(self, **kwargs):
+		if self._launch_error:
+			raise self._launch_error
+		return _FakeBrowser()
+
+	async def stop(self):
+		self.stopped = True
+
+
+class _FakeBrowser:
+	async def close(self):
+		raise RuntimeError('browser already closed')
+
+
+def _patch_async_playwright(monkeypatch, playwrights):
+	class _Starter:
+		async def start(self):
+			playwrights.append(_FakePlaywright(launch_error=RuntimeError('Executable does not exist')))
+			return playwrights[-1]
+
+	monkeypatch.setattr('playwright.async_api.async_playwright', _Starter)
+
+
+def test_shared_browser_stops_playwright_when_launch_fails(monkeypatch):
+	playwrights = []
+	_patch_async_playwright(monkeypatch, playwrights)
+
+	async def _run():
+		browser = SharedBrowser()
+		for _ in range(2):
+			with pytest.raises(RuntimeError, match='Executable does not exist'):
+				await browser.get()
+		return browser
+
+	browser = asyncio.run(_run())
+
+	assert len(playwrights) == 2
+	assert all(playwright.stopped for playwright in playwrights)
+	assert browser._playwright is None
+
+
+def test_shared_browser_close_stops_playwright_when_browser_close_fails():
+	playwright = _FakePlaywright()
+	browser = SharedBrowser()
+	browser._playwright = playwright
+	browser._browser = _FakeBrowser()
+
+	with pytest.raises(RuntimeError, match='browser already closed'):
+		asyncio.run(browser.close())
+
+	assert playwright.stopped
+	assert browser._browser is None
+	assert browser._playwright is None
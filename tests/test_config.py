@@ -0,0 +1,51 @@
+import os
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.config import load_env_file
+
+
+def test_load_env_file(tmp_path, monkeypatch):
+	env_file = tmp_path / '.env'
+	env_file.write_text(
+		'\n'.join(
+			[
+				'# 注释行',
+				'PLAIN=value',
+				'export EXPORTED=exported',
+				'DOUBLE="double quoted"',
+				"SINGLE='single # not a comment'",
+				'INLINE=v # note',
+				'QUOTED_INLINE="v" # note',
+				'HASH_IN_VALUE=a#b',
+				'EMPTY=',
+				'EXISTING=from_file',
+			]
+		),
+		encoding='utf-8',
+	)
+	keys = ('PLAIN', 'EXPORTED', 'DOUBLE', 'SINGLE', 'INLINE', 'QUOTED_INLINE', 'HASH_IN_VALUE', 'EMPTY')
+	for key in keys:
+		monkeypatch.delenv(key, raising=False)
+	monkeypatch.setenv('EXISTING', 'from_env')
+
+	load_env_file(str(env_file))
+
+	assert os.environ['PLAIN'] == 'value'
+	assert os.environ['EXPORTED'] == 'exported'
+	assert os.environ['DOUBLE'] == 'double quoted'
+	assert os.environ['SINGLE'] == 'single # not a comment'
+	assert os.environ['INLINE'] == 'v'
+	assert os.environ['QUOTED_INLINE'] == 'v'
+	assert os.environ['HASH_IN_VALUE'] == 'a#b'
+	assert os.environ['EMPTY'] == ''
+	# 已存在的环境变量不被覆盖
+	assert os.environ['EXISTING'] == 'from_env'
+
+
+def test_load_env_file_missing(tmp_path):
+	load_env_file(str(tmp_path / 'missing.env'))
@@ -1,9 +1,12 @@
+import asyncio
 import os
 import sys
 from datetime import datetime
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
+import orjson
 import pytest
 from dotenv import load_dotenv
 
@@ -13,20 +16,59 @@ sys.path.insert(0, str(project_root))
 
 load_dotenv(project_root / '.env')
 
-from notify import NotificationKit
+from utils.notify import NotificationKit, _host_semaphores, _push_client
+
+DINGTALK_WEBHOOK = (
+	'https://oapi.dingtalk.com/robot/send?access_token=fbcd45f32f17dea5c762e82644c7f28945075e0b4d22953c8eebe064b106a96f'
+)
+
+TEST_ENV = {
+	'EMAIL_USER': 'test@example.com',
+	'EMAIL_PASS': 'test_pass',
+	'EMAIL_TO': 'to@example.com',
+	'PUSHPLUS_TOKEN': 'test_token',
+	'DINGDING_WEBHOOK': DINGTALK_WEBHOOK,
+	'FEISHU_WEBHOOK': 'http://feishu.example.com',
+	'WEIXIN_WEBHOOK': 'http://weixin.example.com',
+	'WEBHOOK_BASE_DELAY_MS': '0',
+	'WEBHOOK_MAX_DELAY_MS': '0',
+}
+
+UNSET_ENV = (
+	'CUSTOM_SMTP_SERVER',
+	'SMTP_SSL',
+	'SMTP_PORT',
+	'SERVERPUSHKEY',
+	'WEBHOOK_URL',
+	'WEBHOOK_HEADERS',
+	'WEBHOOK_MAX_RETRIES',
+	'NOTIFY_CONCURRENCY',
+	'ANYROUTER_DEBUG',
+)
 
 
 @pytest.fixture
-def notification_kit():
+def notification_kit(monkeypatch):
+	for key in UNSET_ENV:
+		monkeypatch.delenv(key, raising=False)
+	for key, value in TEST_ENV.items():
+		monkeypatch.setenv(key, value)
 	return NotificationKit()
 
 
-def test_real_notification(notification_kit):
+@pytest.fixture
+def webhook_kit(notification_kit, monkeypatch):
+	monkeypatch.setenv('WEBHOOK_URL', 'http://webhook.example.com')
+	monkeypatch.setenv('WEBHOOK_MAX_RETRIES', '2')
+	return NotificationKit()
+
+
+def test_real_notification():
 	"""真实接口测试，需要配置.env.local文件"""
 	if os.getenv('ENABLE_REAL_TEST') != 'true':
 		pytest.skip('未启用真实接口测试')
 
-	notification_kit.push_message(
+	NotificationKit().push_message(
 		'测试消息', f'这是一条测试消息\n发送时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
 	)
 
@@ -34,72 +76,226 @@ def test_real_notification(notification_kit):
 @patch('smtplib.SMTP_SSL')
 def test_send_email(mock_smtp, notification_kit):
 	mock_server = MagicMock()
-	mock_smtp.return_value.__enter__.return_value = mock_server
+	mock_smtp.return_value = mock_server
 
-	notification_kit.send_email('测试标题', '测试内容')
+	asyncio.run(notification_kit.send_email('测试标题', '测试内容'))
 
+	mock_smtp.assert_called_once_with('smtp.example.com', 465, timeout=30)
 	assert mock_server.login.called
 	assert mock_server.send_message.called
+	notification_kit.close_smtp()
 
 
-@patch('requests.post')
+@patch('utils.notify.NotificationKit._post', new_callable=AsyncMock)
 def test_send_pushplus(mock_post, notification_kit):
-	notification_kit.send_pushplus('测试标题', '测试内容')
+	asyncio.run(notification_kit.send_pushplus('测试标题', '测试内容'))
 
-	mock_post.assert_called_once()
+	mock_post.assert_awaited_once()
 	args = mock_post.call_args[1]
 	assert 'test_token' in str(args)
 
 
-@patch('requests.post')
+@patch('utils.notify.NotificationKit._post', new_callable=AsyncMock)
 def test_send_dingtalk(mock_post, notification_kit):
-	notification_kit.send_dingtalk('测试标题', '测试内容')
+	asyncio.run(notification_kit.send_dingtalk('测试标题', '测试内容'))
 
-	expected_webhook = 'https://oapi.dingtalk.com/robot/send?access_token=fbcd45f32f17dea5c762e82644c7f28945075e0b4d22953c8eebe064b106a96f'
 	expected_data = {'msgtype': 'text', 'text': {'content': '测试标题\n测试内容'}}
 
-	mock_post.assert_called_once_with(expected_webhook, json=expected_data)
+	mock_post.assert_awaited_once_with(DINGTALK_WEBHOOK, json=expected_data)
 
 
-@patch('requests.post')
+@patch('utils.notify.NotificationKit._post', new_callable=AsyncMock)
 def test_send_feishu(mock_post, notification_kit):
-	notification_kit.send_feishu('测试标题', '测试内容')
+	asyncio.run(notification_kit.send_feishu('测试标题', '测试内容'))
 
-	mock_post.assert_called_once()
+	mock_post.assert_awaited_once()
 	args = mock_post.call_args[1]
 	assert 'card' in args['json']
 
 
-@patch('requests.post')
+@patch('utils.notify.NotificationKit._post', new_callable=AsyncMock)
 def test_send_wecom(mock_post, notification_kit):
-	notification_kit.send_wecom('测试标题', '测试内容')
+	asyncio.run(notification_kit.send_wecom('测试标题', '测试内容'))
 
-	mock_post.assert_called_once_with(
+	mock_post.assert_awaited_once_with(
 		'http://weixin.example.com', json={'msgtype': 'text', 'text': {'content': '测试标题\n测试内容'}}
 	)
 
 
-def test_missing_config():
-	os.environ.clear()
+def test_missing_config(monkeypatch):
+	for key in (*TEST_ENV, *UNSET_ENV):
+		monkeypatch.delenv(key, raising=False)
 	kit = NotificationKit()
 
-	with pytest.raises(ValueError, match='未配置邮箱信息'):
-		kit.send_email('测试', '测试')
+	with pytest.raises(ValueError, match='Email configuration not set'):
+		asyncio.run(kit.send_email('测试', '测试'))
+
+	with pytest.raises(ValueError, match='PushPlus Token not configured'):
+		asyncio.run(kit.send_pushplus('测试', '测试'))
+
+
+def test_post_encodes_json_with_shared_client(notification_kit):
+	requests = []
 
-	with pytest.raises(ValueError, match='未配置PushPlus Token'):
-		kit.send_pushplus('测试', '测试')
+	def handler(request):
+		requests.append(request)
+		return httpx.Response(200)
 
+	async def _run():
+		async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+			_push_client.set(client)
+			_host_semaphores.set({})
+			return await notification_kit._post('http://weixin.example.com', json={'text': '测试'})
 
-@patch('anyrouter.notify.NotificationKit.send_email')
-@patch('anyrouter.notify.NotificationKit.send_dingtalk')
-@patch('anyrouter.notify.NotificationKit.send_wecom')
-@patch('anyrouter.notify.NotificationKit.send_pushplus')
-@patch('anyrouter.notify.NotificationKit.send_feishu')
+	response = asyncio.run(_run())
+
+	assert response.status_code == 200
+	assert requests[0].headers['Content-Type'] == 'application/json'
+	assert orjson.loads(requests[0].content) == {'text': '测试'}
+
+
+@patch('utils.notify.NotificationKit.send_email')
+@patch('utils.notify.NotificationKit.send_dingtalk')
+@patch('utils.notify.NotificationKit.send_wecom')
+@patch('utils.notify.NotificationKit.send_pushplus')
+@patch('utils.notify.NotificationKit.send_feishu')
 def test_push_message(mock_feishu, mock_pushplus, mock_wecom, mock_dingtalk, mock_email, notification_kit):
 	notification_kit.push_message('测试标题', '测试内容')
 
-	assert mock_email.called
-	assert mock_dingtalk.called
-	assert mock_wecom.called
-	assert mock_pushplus.called
-	assert mock_feishu.called
+	mock_email.assert_awaited()
+	mock_dingtalk.assert_awaited()
+	mock_wecom.assert_awaited()
+	mock_pushplus.assert_awaited()
+	mock_feishu.assert_awaited()
+
+
+def test_push_message_runs_channels_concurrently(notification_kit, monkeypatch):
+	in_flight = 0
+	max_in_flight = 0
+
+	async def slow_send(*args, **kwargs):
+		nonlocal in_flight, max_in_flight
+		in_flight += 1
+		max_in_flight = max(max_in_flight, in_flight)
+		await asyncio.sleep(0.05)
+		in_flight -= 1
+
+	for name in ('send_email', 'send_pushplus', 'send_dingtalk', 'send_feishu', 'send_wecom'):
+		monkeypatch.setattr(notification_kit, name, slow_send)
+
+	notification_kit.push_message('测试标题', '测试内容')
+
+	# 5 个渠道，受 NOTIFY_CONCURRENCY 默认值 4 限制
+	assert max_in_flight == 4
+
+
+@patch('utils.notify.NotificationKit.send_email')
+@patch('utils.notify.NotificationKit.send_dingtalk')
+@patch('utils.notify.NotificationKit.send_wecom')
+@patch('utils.notify.NotificationKit.send_pushplus')
+@patch('utils.notify.NotificationKit.send_feishu')
+def test_push_message_isolates_failures(
+	mock_feishu, mock_pushplus, mock_wecom, mock_dingtalk, mock_email, notification_kit, capsys
+):
+	mock_email.side_effect = OSError('smtp down')
+	mock_dingtalk.side_effect = ValueError('bad webhook')
+
+	notification_kit.push_message('测试标题', '测试内容')
+
+	mock_wecom.assert_awaited()
+	mock_pushplus.assert_awaited()
+	mock_feishu.assert_awaited()
+	output = capsys.readouterr().out
+	assert '[Email]: Message push failed! Reason: smtp down' in output
+	assert '[DingTalk]: Message push failed! Reason: bad webhook' in output
+	assert '[WeChat Work]: Message push successful!' in output
+
+
+def test_push_message_without_channels(monkeypatch, capsys):
+	for key in (*TEST_ENV, *UNSET_ENV):
+		monkeypatch.delenv(key, raising=False)
+
+	NotificationKit().push_message('测试标题', '测试内容')
+
+	assert 'No notification channels configured' in capsys.readouterr().out
+
+
+@patch('utils.notify.NotificationKit._post', new_callable=AsyncMock)
+def test_request_webhook_retries_on_retry_status(mock_post, webhook_kit):
+	mock_post.side_effect = [httpx.Response(503), httpx.Response(429), httpx.Response(200)]
+
+	response = asyncio.run(webhook_kit._request_webhook({}, b'{}'))
+
+	assert response.status_code == 200
+	assert mock_post.await_count == 3
+
+
+@patch('utils.notify.NotificationKit._post', new_callable=AsyncMock)
+def test_request_webhook_returns_last_response_when_exhausted(mock_post, webhook_kit):
+	mock_post.return_value = httpx.Response(503)
+
+	response = asyncio.run(webhook_kit._request_webhook({}, b'{}'))
+
+	assert response.status_code == 503
+	assert mock_post.await_count == 3
+
+
+@patch('utils.notify.NotificationKit._post', new_callable=AsyncMock)
+def test_request_webhook_does_not_retry_client_errors(mock_post, webhook_kit):
+	mock_post.return_value = httpx.Response(404)
+
+	response = asyncio.run(webhook_kit._request_webhook({}, b'{}'))
+
+	assert response.status_code == 404
+	assert mock_post.await_count == 1
+
+
+@patch('utils.notify.NotificationKit._post', new_callable=AsyncMock)
+def test_request_webhook_retries_transport_errors(mock_post, webhook_kit):
+	mock_post.side_effect = [httpx.ConnectError('refused'), httpx.Response(200)]
+
+	response = asyncio.run(webhook_kit._request_webhook({}, b'{}'))
+
+	assert response.status_code == 200
+	assert mock_post.await_count == 2
+
+
+@patch('utils.notify.NotificationKit._post', new_callable=AsyncMock)
+def test_request_webhook_raises_when_transport_errors_exhausted(mock_post, webhook_kit):
+	mock_post.side_effect = httpx.ConnectError('refused')
+
+	with pytest.raises(httpx.ConnectError):
+		asyncio.run(webhook_kit._request_webhook({}, b'{}'))
+
+	assert mock_post.await_count == 3
+
+
+@patch('utils.notify.NotificationKit._post', new_callable=AsyncMock)
+def test_send_webhook_error_includes_body_preview(mock_post, webhook_kit):
+	mock_post.return_value = httpx.Response(404, content=b'x' * 1000)
+
+	with pytest.raises(ValueError, match=r'404 Not Found - x{100}$'):
+		asyncio.run(webhook_kit.send_webhook('测试标题', '测试内容'))
+
+
+def test_webhook_retry_delay(webhook_kit):
+	webhook_kit.webhook_base_delay = 0.5
+	webhook_kit.webhook_max_delay = 10.0
+
+	assert webhook_kit._webhook_retry_delay(0, '3') == 3.0
+	# Retry-After 同样受最大等待时间限制
+	assert webhook_kit._webhook_retry_delay(0, '120') == 10.0
+	# 非数字的 Retry-After（如 HTTP 日期）回退到指数退避
+	assert 0.5 <= webhook_kit._webhook_retry_delay(0, 'Wed, 21 Oct 2015 07:28:00 GMT') <= 0.625
+	assert 2.0 <= webhook_kit._webhook_retry_delay(2) <= 2.5
+	assert 10.0 <= webhook_kit._webhook_retry_delay(10) <= 12.5
+
+
+@pytest.mark.parametrize(
+	'value, expected',
+	[('', False), ('0', False), ('false', False), ('No', False), ('1', True), ('true', True)],
+)
+def test_debug_flag(value, expected, notification_kit, monkeypatch):
+	monkeypatch.setenv('ANYROUTER_DEBUG', value)
+
+	assert NotificationKit().debug is expected
@@ -3,11 +3,14 @@
 配置管理模块
 """
 
-import json
 import os
+import re
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Literal
 
+import orjson
+
 
 @dataclass
 class ProviderConfig:
@@ -82,7 +85,7 @@ class AppConfig:
 		providers_str = os.getenv('PROVIDERS')
 		if providers_str:
 			try:
-				providers_data = json.loads(providers_str)
+				providers_data = orjson.loads(providers_str)
 
 				if not isinstance(providers_data, dict):
 					print('[WARNING] PROVIDERS must be a JSON object, ignoring custom providers')
@@ -97,7 +100,7 @@ class AppConfig:
 						continue
 
 				print(f'[INFO] Loaded {len(providers_data)} custom provider(s) from PROVIDERS environment variable')
-			except json.JSONDecodeError as e:
+			except orjson.JSONDecodeError as e:
 				print(
 					f'[WARNING] Failed to parse PROVIDERS environment variable: {e}, using default configuration only'
 				)
@@ -133,27 +136,51 @@ class AccountConfig:
 		return self.name if self.name else f'Account {index + 1}'
 
 
-def load_accounts_config() -> list[AccountConfig] | None:
-	"""从环境变量加载账号配置"""
-	accounts_str = os.getenv('ANYROUTER_ACCOUNTS')
-	if not accounts_str:
-		print('ERROR: ANYROUTER_ACCOUNTS environment variable not found')
-		return None
+def load_env_file(path: str = '.env'):
+	"""加载 .env 文件到环境变量，已存在的环境变量不会被覆盖"""
+	if not os.path.exists(path):
+		return
+
+	with open(path, 'r', encoding='utf-8') as f:
+		for line in f:
+			line = line.strip()
+			if not line or line.startswith('#') or '=' not in line:
+				continue
+
+			key, value = line.split('=', 1)
+			key = key.removeprefix('export ').strip()
+			value = value.strip()
+			quote_end = value.find(value[0], 1) if value[:1] in ('"', "'") else -1
+			if quote_end != -1:
+				# 引号内原样保留，闭合引号之后的内容（如行内注释）忽略
+				value = value[1:quote_end]
+			else:
+				# 与 python-dotenv 一致，未加引号的值去掉空白加 # 开头的行内注释
+				value = re.split(r'\s#', value, maxsplit=1)[0].rstrip()
+
+			os.environ.setdefault(key, value)
+
+
+# 账号配置必需的字段
+REQUIRED_ACCOUNT_KEYS = frozenset({'cookies', 'api_user'})
 
+
+@lru_cache(maxsize=1)
+def _parse_accounts_config(accounts_str: str) -> tuple[AccountConfig, ...] | None:
+	"""解析并校验账号配置，相同的配置字符串只解析一次"""
 	try:
-		accounts_data = json.loads(accounts_str)
+		accounts_data = orjson.loads(accounts_str)
 
 		if not isinstance(accounts_data, list):
 			print('ERROR: Account configuration must use array format [{}]')
 			return None
 
-		accounts = []
 		for i, account_dict in enumerate(accounts_data):
 			if not isinstance(account_dict, dict):
 				print(f'ERROR: Account {i + 1} configuration format is incorrect')
 				return None
 
-			if 'cookies' not in account_dict or 'api_user' not in account_dict:
+			if not REQUIRED_ACCOUNT_KEYS <= account_dict.keys():
 				print(f'ERROR: Account {i + 1} missing required fields (cookies, api_user)')
 				return None
 
@@ -161,9 +188,18 @@ def load_accounts_config() -> list[AccountConfig] | None:
 				print(f'ERROR: Account {i + 1} name field cannot be empty')
 				return None
 
-			accounts.append(AccountConfig.from_dict(account_dict, i))
-
-		return accounts
+		return tuple(AccountConfig.from_dict(account_dict, i) for i, account_dict in enumerate(accounts_data))
 	except Exception as e:
 		print(f'ERROR: Account configuration format is incorrect: {e}')
 		return None
+
+
+def load_accounts_config() -> list[AccountConfig] | None:
+	"""从环境变量加载多账号配置"""
+	accounts_str = os.getenv('ANYROUTER_ACCOUNTS')
+	if not accounts_str:
+		print('ERROR: ANYROUTER_ACCOUNTS environment variable not found')
+		return None
+
+	accounts = _parse_accounts_config(accounts_str)
+	return list(accounts) if accounts is not None else None
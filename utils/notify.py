@@ -1,12 +1,46 @@
+import asyncio
+import atexit
 import base64
-import json
 import os
+import random
 import smtplib
+import threading
+from contextvars import ContextVar
 from email.mime.text import MIMEText
-from typing import Literal
+from typing import Awaitable, Callable, Literal
 
 import httpx
-import requests
+import orjson
+
+# webhook 遇到这些状态码时重试
+WEBHOOK_RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# Telegram 消息的整体状态，键为 (全部成功, 至少一个成功)
+_STATUS = {
+	(True, True): ('✅', 'All Successful'),
+	(True, False): ('✅', 'All Successful'),
+	(False, True): ('⚠️', 'Partially Successful'),
+	(False, False): ('❌', 'All Failed'),
+}
+
+# 推送客户端配置：启用 HTTP/2，同一主机的多个请求复用一条连接
+NOTIFY_TIMEOUT = httpx.Timeout(30.0, connect=5.0, write=10.0, pool=5.0)
+NOTIFY_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=120)
+
+# 同一主机同时进行的请求数上限
+NOTIFY_PER_HOST_CONCURRENCY = 2
+
+# 单次推送期间所有渠道共享的 HTTP 客户端及按主机划分的信号量
+_push_client: ContextVar[httpx.AsyncClient | None] = ContextVar('_push_client', default=None)
+_host_semaphores: ContextVar[dict[str, asyncio.Semaphore] | None] = ContextVar('_host_semaphores', default=None)
+
+
+def _env_int(name: str, default: int) -> int:
+	"""读取非负整数环境变量，缺失或非法时使用默认值"""
+	try:
+		return max(0, int(os.getenv(name, '')))
+	except ValueError:
+		return default
 
 
 class NotificationKit:
@@ -15,6 +49,12 @@ class NotificationKit:
 		self.email_pass: str = os.getenv('EMAIL_PASS', '')
 		self.email_to: str = os.getenv('EMAIL_TO', '')
 		self.smtp_server: str = os.getenv('CUSTOM_SMTP_SERVER', '')
+		# SMTP 主机、端口与加密方式只解析一次：默认 465 端口 SSL，SMTP_SSL=0 时使用 STARTTLS（默认 587 端口）
+		email_domain = self.email_user.partition('@')[2]
+		self._smtp_host = self.smtp_server or (f'smtp.{email_domain}' if email_domain else '')
+		self._smtp_ssl = os.getenv('SMTP_SSL', '1').strip().lower() not in ('0', 'false', 'no')
+		default_port = 465 if self._smtp_ssl else 587
+		self._smtp_port = _env_int('SMTP_PORT', default_port) or default_port
 		self.pushplus_token = os.getenv('PUSHPLUS_TOKEN')
 		self.server_push_key = os.getenv('SERVERPUSHKEY')
 		self.dingding_webhook = os.getenv('DINGDING_WEBHOOK')
@@ -22,9 +62,59 @@ class NotificationKit:
 		self.weixin_webhook = os.getenv('WEIXIN_WEBHOOK')
 		self.webhook_url = os.getenv('WEBHOOK_URL')
 		self.webhook_headers = os.getenv('WEBHOOK_HEADERS', '{}')
+		# 对敏感信息进行base64编码，仅用于调试输出
+		self._safe_url = base64.b64encode(self.webhook_url.encode()).decode() if self.webhook_url else ''
+		self._safe_headers = base64.b64encode(self.webhook_headers.encode()).decode()
+		self.debug = os.getenv('ANYROUTER_DEBUG', '').strip().lower() not in ('', '0', 'false', 'no')
+
+		# 解析自定义headers，配置不变，只需解析一次
+		try:
+			custom_headers = orjson.loads(self.webhook_headers)
+		except orjson.JSONDecodeError:
+			custom_headers = {}
+		self._custom_headers: dict = custom_headers if isinstance(custom_headers, dict) else {}
+		# 增加支持对于telegram的特殊处理
+		self._is_telegram = str(self._custom_headers.get('WEBHOOK_TYPE', '')).lower() == 'telegram'
+		self._webhook_request_headers = {
+			'Content-Type': 'application/json',
+			'User-Agent': 'AnyRouter-CheckIn/1.0.0',
+			**self._custom_headers,
+		}
+		self.notify_concurrency = max(1, _env_int('NOTIFY_CONCURRENCY', 4))
+		self.webhook_max_retries = _env_int('WEBHOOK_MAX_RETRIES', 3)
+		self.webhook_base_delay = _env_int('WEBHOOK_BASE_DELAY_MS', 500) / 1000
+		self.webhook_max_delay = _env_int('WEBHOOK_MAX_DELAY_MS', 10000) / 1000
+
+		# 已登录的 SMTP 连接，多次发信时复用，进程退出时关闭
+		self._smtp: smtplib.SMTP | None = None
+		self._smtp_lock = threading.Lock()
+		atexit.register(self.close_smtp)
+
+		# 只保留已配置的渠道，推送时不再为未配置的渠道抛出并打印异常
+		# 各发送函数统一接收 (title, content, msg_type, structured_data)
+		channels = [
+			(
+				'Email',
+				self.email_user and self.email_pass and self.email_to and self._smtp_host,
+				lambda t, c, m, d: self.send_email(t, c, m),
+			),
+			('PushPlus', self.pushplus_token, lambda t, c, m, d: self.send_pushplus(t, c)),
+			('Server Push', self.server_push_key, lambda t, c, m, d: self.send_serverPush(t, c)),
+			('DingTalk', self.dingding_webhook, lambda t, c, m, d: self.send_dingtalk(t, c)),
+			('Feishu', self.feishu_webhook, lambda t, c, m, d: self.send_feishu(t, c)),
+			('WeChat Work', self.weixin_webhook, lambda t, c, m, d: self.send_wecom(t, c)),
+			('Webhook', self.webhook_url, lambda t, c, m, d: self.send_webhook(t, c, d)),
+		]
+		self._enabled: list[tuple[str, Callable[..., Awaitable]]] = [
+			(name, send) for name, configured, send in channels if configured
+		]
+
+	async def send_email(self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text'):
+		# smtplib 是阻塞调用，放到线程中执行以免阻塞其他渠道
+		await asyncio.to_thread(self._send_email, title, content, msg_type)
 
-	def send_email(self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text'):
-		if not self.email_user or not self.email_pass or not self.email_to:
+	def _send_email(self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text'):
+		if not self.email_user or not self.email_pass or not self.email_to or not self._smtp_host:
 			raise ValueError('Email configuration not set')
 
 		# MIMEText 需要 'plain' 或 'html'，而不是 'text'
@@ -34,36 +124,70 @@ class NotificationKit:
 		msg['To'] = self.email_to
 		msg['Subject'] = title
 
-		smtp_server = self.smtp_server if self.smtp_server else f'smtp.{self.email_user.split("@")[1]}'
-		with smtplib.SMTP_SSL(smtp_server, 465) as server:
+		with self._smtp_lock:
+			server = self._get_smtp()
+			try:
+				server.send_message(msg)
+			except (smtplib.SMTPServerDisconnected, OSError):
+				# 连接已不可用，丢弃后下次重新建立
+				self.close_smtp()
+				raise
+
+	def _get_smtp(self) -> smtplib.SMTP:
+		"""获取可用的 SMTP 连接，缓存的连接先用 RSET 探测是否仍然有效"""
+		if self._smtp is not None:
+			try:
+				self._smtp.rset()
+				return self._smtp
+			except (smtplib.SMTPException, OSError):
+				self.close_smtp()
+
+		if self._smtp_ssl:
+			server = smtplib.SMTP_SSL(self._smtp_host, self._smtp_port, timeout=30)
+		else:
+			server = smtplib.SMTP(self._smtp_host, self._smtp_port, timeout=30)
+		try:
+			if not self._smtp_ssl:
+				server.starttls()
 			server.login(self.email_user, self.email_pass)
-			server.send_message(msg)
+		except Exception:
+			server.close()
+			raise
+		self._smtp = server
+		return server
+
+	def close_smtp(self):
+		"""关闭缓存的 SMTP 连接"""
+		server, self._smtp = self._smtp, None
+		if server is None:
+			return
+		try:
+			server.quit()
+		except (smtplib.SMTPException, OSError):
+			server.close()
 
-	def send_pushplus(self, title: str, content: str):
+	async def send_pushplus(self, title: str, content: str):
 		if not self.pushplus_token:
 			raise ValueError('PushPlus Token not configured')
 
 		data = {'token': self.pushplus_token, 'title': title, 'content': content, 'template': 'html'}
-		with httpx.Client(timeout=30.0) as client:
-			client.post('http://www.pushplus.plus/send', json=data)
+		await self._post('http://www.pushplus.plus/send', json=data)
 
-	def send_serverPush(self, title: str, content: str):
+	async def send_serverPush(self, title: str, content: str):
 		if not self.server_push_key:
 			raise ValueError('Server Push key not configured')
 
 		data = {'title': title, 'desp': content}
-		with httpx.Client(timeout=30.0) as client:
-			client.post(f'https://sctapi.ftqq.com/{self.server_push_key}.send', json=data)
+		await self._post(f'https://sctapi.ftqq.com/{self.server_push_key}.send', json=data)
 
-	def send_dingtalk(self, title: str, content: str):
+	async def send_dingtalk(self, title: str, content: str):
 		if not self.dingding_webhook:
 			raise ValueError('DingTalk Webhook not configured')
 
 		data = {'msgtype': 'text', 'text': {'content': f'{title}\n{content}'}}
-		with httpx.Client(timeout=30.0) as client:
-			client.post(self.dingding_webhook, json=data)
+		await self._post(self.dingding_webhook, json=data)
 
-	def send_feishu(self, title: str, content: str):
+	async def send_feishu(self, title: str, content: str):
 		if not self.feishu_webhook:
 			raise ValueError('Feishu Webhook not configured')
 
@@ -74,92 +198,71 @@ class NotificationKit:
 				'header': {'template': 'blue', 'title': {'content': title, 'tag': 'plain_text'}},
 			},
 		}
-		with httpx.Client(timeout=30.0) as client:
-			client.post(self.feishu_webhook, json=data)
+		await self._post(self.feishu_webhook, json=data)
 
-	def send_wecom(self, title: str, content: str):
+	async def send_wecom(self, title: str, content: str):
 		if not self.weixin_webhook:
 			raise ValueError('WeChat Work Webhook not configured')
 
 		data = {'msgtype': 'text', 'text': {'content': f'{title}\n{content}'}}
-		with httpx.Client(timeout=30.0) as client:
-			client.post(self.weixin_webhook, json=data)
+		await self._post(self.weixin_webhook, json=data)
 
-	def send_webhook(self, title: str, content: str, structured_data=None):
+	async def send_webhook(self, title: str, content: str, structured_data=None):
 		if not self.webhook_url:
 			raise ValueError('Webhook URL not configured')
 
-		# 解析自定义headers
-		try:
-			custom_headers = json.loads(self.webhook_headers)
-		except json.JSONDecodeError:
-			custom_headers = {}
-		
-		# 增加支持对于telegram的特殊处理
-		if "WEBHOOK_TYPE" in custom_headers and custom_headers["WEBHOOK_TYPE"].lower() == "telegram":
+		if self._is_telegram:
 			if structured_data:
 				# 为 Telegram Bot 构建 HTML 格式的消息
 				html_content = self._format_telegram_html(structured_data)
-				payload = json.dumps({
-					"message": html_content
-				})
+				payload = orjson.dumps({'message': html_content})
 			else:
 				# fallback 到纯文本
-				payload = json.dumps({
-					"text": f"<b>{title}</b>\n\n{content}",
-					"parse_mode": "HTML"
-				})
+				payload = orjson.dumps({'text': f'<b>{title}</b>\n\n{content}', 'parse_mode': 'HTML'})
 		else:
 			# 构建请求数据 - 直接发送 content 作为 message
-			payload = json.dumps({
-				"message": content
-			})
-		
-
-		
-		# 构建请求头
-		headers = {
-			'Content-Type': 'application/json',
-			'User-Agent': 'AnyRouter-CheckIn/1.0.0'
-		}
-		headers.update(custom_headers)
-		
-		# 对敏感信息进行base64编码显示
-		safe_url = base64.b64encode(self.webhook_url.encode()).decode()
-		safe_headers = base64.b64encode(self.webhook_headers.encode()).decode()
-		print(f'[DEBUG] webhook_url: {safe_url}')
-		print(f'[DEBUG] webhook_headers: {safe_headers}')
-		print(f'[DEBUG] payload size: {len(payload)} bytes')
-		
+			payload = orjson.dumps({'message': content})
+
+		# 调试输出仅在设置 ANYROUTER_DEBUG 时打印
+		if self.debug:
+			print(f'[DEBUG] webhook_url: {self._safe_url}')
+			print(f'[DEBUG] webhook_headers: {self._safe_headers}')
+			print(f'[DEBUG] payload size: {len(payload)} bytes')
+
 		try:
-			print(f'[DEBUG] Sending POST request to webhook...')
-			
+			if self.debug:
+				print('[DEBUG] Sending POST request to webhook...')
+
 			# 发送请求
-			response = requests.request("POST", self.webhook_url, headers=headers, data=payload)
-			
-			print(f'[DEBUG] Response status: {response.status_code} {response.reason}')
-			print(f'[DEBUG] Response headers: {dict(response.headers)}')
-			print(f'[DEBUG] Response content: {response.text[:500]}...' if len(response.text) > 500 else f'[DEBUG] Response content: {response.text}')
+			response = await self._request_webhook(self._webhook_request_headers, payload)
+
+			if self.debug:
+				print(f'[DEBUG] Response status: {response.status_code} {response.reason_phrase}')
+				print('[DEBUG] Response headers:', *(f'{key}={value}' for key, value in response.headers.items()))
+				# 只解码前 512 字节用于预览，避免大响应体整体转成字符串
+				preview = response.content[:512].decode('utf-8', 'replace')
+				print(f"[DEBUG] Response content: {preview}{'...' if len(response.content) > 512 else ''}")
 
 			# 检查响应状态
 			if 200 <= response.status_code < 300:
-				print('[DEBUG] Webhook request completed successfully')
+				if self.debug:
+					print('[DEBUG] Webhook request completed successfully')
 			else:
-				error_msg = f'Webhook returned non-2xx status: {response.status_code} {response.reason}'
+				error_msg = f'Webhook returned non-2xx status: {response.status_code} {response.reason_phrase}'
 				print(f'[WARNING] {error_msg}')
-				print(f'[DEBUG] Response body: {response.text}')
-				raise ValueError(f'{error_msg} - {response.text[:100]}')
+				# 响应体已在调试输出中预览过，这里只截取前 100 字节附在异常信息中
+				raise ValueError(f"{error_msg} - {response.content[:100].decode('utf-8', 'replace')}")
 
-		except requests.exceptions.ConnectTimeout as e:
+		except httpx.ConnectTimeout as e:
 			print(f'[ERROR] Webhook connection timeout: {e}')
 			raise
-		except requests.exceptions.ConnectionError as e:
+		except httpx.ConnectError as e:
 			print(f'[ERROR] Webhook connection error: {e}')
 			raise
-		except requests.exceptions.Timeout as e:
+		except httpx.TimeoutException as e:
 			print(f'[ERROR] Webhook request timeout: {e}')
 			raise
-		except requests.exceptions.RequestException as e:
+		except httpx.RequestError as e:
 			print(f'[ERROR] Webhook request error: {e}')
 			raise
 		except ValueError as e:
@@ -169,111 +272,148 @@ class NotificationKit:
 			print(f'[ERROR] Unexpected webhook error: {e}')
 			raise
 
+	async def _request_webhook(self, headers: dict, payload: bytes):
+		"""发送 webhook 请求，网络错误、429 和 5xx 时按指数退避加抖动重试"""
+		for attempt in range(self.webhook_max_retries + 1):
+			retry_after = None
+			try:
+				response = await self._post(self.webhook_url, headers=headers, content=payload)
+				if response.status_code not in WEBHOOK_RETRY_STATUS or attempt == self.webhook_max_retries:
+					return response
+				reason = f'HTTP {response.status_code}'
+				retry_after = response.headers.get('Retry-After')
+			except httpx.TransportError as e:
+				if attempt == self.webhook_max_retries:
+					raise
+				reason = str(e)
+
+			delay = self._webhook_retry_delay(attempt, retry_after)
+			print(f'[WARNING] Webhook attempt {attempt + 1} failed ({reason}), retrying in {delay:.2f}s')
+			await asyncio.sleep(delay)
+
+	def _webhook_retry_delay(self, attempt: int, retry_after: str | None = None) -> float:
+		"""计算重试等待时间，优先遵循 Retry-After"""
+		if retry_after and retry_after.isdigit():
+			return min(float(retry_after), self.webhook_max_delay)
+		delay = min(self.webhook_max_delay, self.webhook_base_delay * 2**attempt)
+		return delay * (1 + random.random() * 0.25)
+
 	def _format_telegram_html(self, structured_data):
 		"""为 Telegram Bot 格式化 HTML 消息"""
 		title = structured_data.get('title', 'Check-in Results')
 		summary = structured_data.get('summary', {})
 		accounts = structured_data.get('accounts', [])
-		
-		# 构建 HTML 消息
-		html_parts = []
-		
-		# 标题
-		html_parts.append(f"<b>🤖 {title}</b>")
-		
-		# 执行时间
-		if 'execution_time' in summary:
-			html_parts.append(f"⏰ <i>{summary['execution_time']}</i>")
-		
+
 		# 统计信息
 		success_count = summary.get('success_count', 0)
 		total_count = summary.get('total_count', 0)
-		
-		if success_count == total_count:
-			status_emoji = "✅"
-			status_text = "All Successful"
-		elif success_count > 0:
-			status_emoji = "⚠️"
-			status_text = "Partially Successful"
-		else:
-			status_emoji = "❌"
-			status_text = "All Failed"
-		
-		html_parts.append(f"\n{status_emoji} <b>Status:</b> {status_text}")
-		html_parts.append(f"📊 <b>Results:</b> {success_count}/{total_count} accounts")
-		
+		status_emoji, status_text = _STATUS[(success_count == total_count, success_count > 0)]
+
+		# 标题、执行时间与统计
+		html_parts = [f'<b>🤖 {title}</b>']
+		if 'execution_time' in summary:
+			html_parts.append(f"⏰ <i>{summary['execution_time']}</i>")
+		html_parts.append(f'\n{status_emoji} <b>Status:</b> {status_text}')
+		html_parts.append(f'📊 <b>Results:</b> {success_count}/{total_count} accounts')
+
 		# 账号详情
 		if accounts:
-			html_parts.append("\n<b>📋 Account Details:</b>")
-			for account in accounts:
-				account_num = account.get('account_index', 'Unknown')
-				success = account.get('success', False)
-				
-				# 状态标识
-				status_icon = "✅" if success else "❌"
-				html_parts.append(f"\n{status_icon} <b>Account {account_num}</b>")
-				
-				# 余额信息
-				if success and account.get('balance_before_raw') is not None and account.get('balance_after_raw') is not None:
-					before_balance = account.get('balance_before_raw')
-					after_balance = account.get('balance_after_raw')
-					balance_diff = after_balance - before_balance
-					
-					if balance_diff > 0:
-						html_parts.append(f"   💰 Balance: ${before_balance:.2f} → ${after_balance:.2f} <b>(+${balance_diff:.2f})</b>")
-					else:
-						html_parts.append(f"   💰 Balance: ${before_balance:.2f} (No change)")
-				elif account.get('balance_before') and account.get('balance_after'):
-					# fallback 到文本格式
-					html_parts.append(f"   📝 Before: {account.get('balance_before')}")
-					html_parts.append(f"   📝 After: {account.get('balance_after')}")
-				
-				# 错误信息
-				if not success and account.get('error_message'):
-					error_msg = account.get('error_message', 'Unknown error')
-					html_parts.append(f"   ❌ Error: <code>{error_msg[:50]}{'...' if len(error_msg) > 50 else ''}</code>")
-		
+			html_parts.append('\n<b>📋 Account Details:</b>')
+			html_parts.extend(line for account in accounts for line in self._format_telegram_account(account))
+
 		return '\n'.join(html_parts)
 
-	def push_message(self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text'):
-		notifications = [
-			('Email', lambda: self.send_email(title, content, msg_type)),
-			('PushPlus', lambda: self.send_pushplus(title, content)),
-			('Server Push', lambda: self.send_serverPush(title, content)),
-			('DingTalk', lambda: self.send_dingtalk(title, content)),
-			('Feishu', lambda: self.send_feishu(title, content)),
-			('WeChat Work', lambda: self.send_wecom(title, content)),
-			('Webhook', lambda: self.send_webhook(title, content)),
-		]
+	@staticmethod
+	def _format_telegram_account(account) -> list[str]:
+		"""格式化单个账号的 Telegram HTML 行"""
+		success = account.get('success', False)
+		lines = [f"\n{'✅' if success else '❌'} <b>Account {account.get('account_index', 'Unknown')}</b>"]
+
+		# 余额信息
+		before_balance = account.get('balance_before_raw')
+		after_balance = account.get('balance_after_raw')
+		if success and before_balance is not None and after_balance is not None:
+			balance_diff = after_balance - before_balance
+			if balance_diff > 0:
+				lines.append(
+					f'   💰 Balance: ${before_balance:.2f} → ${after_balance:.2f} <b>(+${balance_diff:.2f})</b>'
+				)
+			else:
+				lines.append(f'   💰 Balance: ${before_balance:.2f} (No change)')
+		elif account.get('balance_before') and account.get('balance_after'):
+			# fallback 到文本格式
+			lines.append(f"   📝 Before: {account['balance_before']}")
+			lines.append(f"   📝 After: {account['balance_after']}")
+
+		# 错误信息
+		error_msg = account.get('error_message')
+		if not success and error_msg:
+			lines.append(f"   ❌ Error: <code>{error_msg[:50]}{'...' if len(error_msg) > 50 else ''}</code>")
 
-		for name, func in notifications:
+		return lines
+
+	async def _post(self, url: str, json=None, **kwargs) -> httpx.Response:
+		"""发送 POST 请求，推送期间复用共享客户端，单独调用时临时创建"""
+		if json is not None:
+			# 用 orjson 直接序列化为 bytes，代替 httpx 内置的 json 编码
+			kwargs['content'] = orjson.dumps(json)
+			kwargs['headers'] = {'Content-Type': 'application/json', **kwargs.get('headers', {})}
+		client = _push_client.get()
+		if client is not None:
+			# 同一主机的并发请求受限，避免重试时集中冲击同一服务
+			semaphores = _host_semaphores.get()
+			host = httpx.URL(url).host
+			if host not in semaphores:
+				semaphores[host] = asyncio.Semaphore(NOTIFY_PER_HOST_CONCURRENCY)
+			async with semaphores[host]:
+				return await client.post(url, **kwargs)
+		async with httpx.AsyncClient(http2=True, timeout=NOTIFY_TIMEOUT, limits=NOTIFY_LIMITS) as client:
+			return await client.post(url, **kwargs)
+
+	async def _push(self, notifications):
+		"""并发推送到所有渠道，单个渠道失败不影响其他渠道"""
+		if not notifications:
+			print('[INFO] No notification channels configured, skipping push')
+			return
+
+		# 信号量在每次推送时创建，同步入口每次都会使用新的事件循环
+		semaphore = asyncio.Semaphore(self.notify_concurrency)
+
+		async def _send(name, coro):
 			try:
-				func()
+				async with semaphore:
+					await coro
 				print(f'[{name}]: Message push successful!')
 			except Exception as e:
 				print(f'[{name}]: Message push failed! Reason: {str(e)}')
 
-	def push_message_structured(self, notification_data, msg_type: Literal['text', 'html'] = 'text'):
+		async with httpx.AsyncClient(http2=True, timeout=NOTIFY_TIMEOUT, limits=NOTIFY_LIMITS) as client:
+			client_token = _push_client.set(client)
+			semaphores_token = _host_semaphores.set({})
+			try:
+				await asyncio.gather(*(_send(name, coro) for name, coro in notifications))
+			finally:
+				_host_semaphores.reset(semaphores_token)
+				_push_client.reset(client_token)
+
+	async def apush_message(self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text'):
+		await self._push([(name, send(title, content, msg_type, None)) for name, send in self._enabled])
+
+	async def apush_message_structured(self, notification_data, msg_type: Literal['text', 'html'] = 'text'):
 		"""发送结构化通知数据，支持 Telegram HTML 格式"""
 		title = notification_data.get('title', 'Notification')
 		content = notification_data.get('content', '')
-		
-		notifications = [
-			('Email', lambda: self.send_email(title, content, msg_type)),
-			('PushPlus', lambda: self.send_pushplus(title, content)),
-			('Server Push', lambda: self.send_serverPush(title, content)),
-			('DingTalk', lambda: self.send_dingtalk(title, content)),
-			('Feishu', lambda: self.send_feishu(title, content)),
-			('WeChat Work', lambda: self.send_wecom(title, content)),
-			('Webhook', lambda: self.send_webhook(title, content, notification_data)),  # 传递结构化数据给 webhook
-		]
 
-		for name, func in notifications:
-			try:
-				func()
-				print(f'[{name}]: Message push successful!')
-			except Exception as e:
-				print(f'[{name}]: Message push failed! Reason: {str(e)}')
+		# 结构化数据只有 webhook 会使用
+		await self._push([(name, send(title, content, msg_type, notification_data)) for name, send in self._enabled])
+
+	def push_message(self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text'):
+		"""同步调用入口，供不在事件循环中的调用方使用"""
+		asyncio.run(self.apush_message(title, content, msg_type))
+
+	def push_message_structured(self, notification_data, msg_type: Literal['text', 'html'] = 'text'):
+		"""同步调用入口，供不在事件循环中的调用方使用"""
+		asyncio.run(self.apush_message_structured(notification_data, msg_type))
 
 
 notify = NotificationKit()